@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import argparse
+import threading
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+import draw_store
+import bingo_parser
+import pilio_client
+
+# 賓果歷史回補：沿著 list.asp?indexpage=N 往回走到指定期別，寫進共用的 draw_store。
+# 期別在同一個民國年內是連續的，所以由已抓過的頁可以推算後面每一頁的期別範圍；
+# 推算出的期別資料庫都已經有了就整頁跳過，只抓有缺號的頁。進度寫在 checkpoint，中斷後重跑會接著做。
+GAME = "bingo"
+BASE_URL = pilio_client.url("/bingo/list.asp")
+DRAWS_PER_DAY = 203          # 07:05 ~ 23:55 每 5 分鐘一期
+YEAR_SPAN = 1000000          # 期別 = 民國年 x 1000000 + 當年序號
+WORKERS = 4
+RATE = 2.0                   # 每秒最多幾個請求 (全部執行緒合計)
+RETRIES = 3
+MAX_PAGES = 5000
+STATE_PATH = draw_store.DB_PATH + "-backfill.json"
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_at = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+        if start > now: time.sleep(start - now)
+
+
+def page_url(page):
+    return BASE_URL if page == 1 else f"{BASE_URL}?indexpage={page}"
+
+# 回傳該頁的期別 (新到舊) 與 draws；連續失敗 RETRIES 次回傳 None
+def fetch_page(page, limiter):
+    for attempt in range(RETRIES):
+        limiter.wait()
+        try:
+            res = pilio_client.get(page_url(page), timeout=10, conditional=False)
+            if res.status_code == 200:
+                ids, nums = bingo_parser.parse(res.content)
+                return ids.tolist(), bingo_parser.to_draws(ids, nums)
+        except Exception:
+            pass
+        if attempt < RETRIES - 1: time.sleep(2 ** attempt)
+    return None
+
+def same_year(a, b):
+    return a // YEAR_SPAN == b // YEAR_SPAN
+
+# 由最近一個已抓頁 (頁碼 < page) 推算 page 的期別範圍 (新到舊)；跨年或沒有依據時回傳 None
+def predict_ids(page, pages_seen, per_page):
+    anchors = [p for p in pages_seen if p < page]
+    if not anchors: return None
+    q = max(anchors)
+    last = pages_seen[q][-1]
+    first = last - (page - q - 1) * per_page - 1
+    lowest = first - per_page + 1
+    if lowest % YEAR_SPAN < 1 or not same_year(first, last): return None
+    return list(range(first, lowest - 1, -1))
+
+def missing_ids(known, latest, until_id):
+    # 只檢查和最新一期同一年的區段 (前一年的最後一期無從得知)
+    low = max(until_id, latest // YEAR_SPAN * YEAR_SPAN + 1)
+    return [i for i in range(latest, low - 1, -1) if i not in known]
+
+def load_state(path, until_id):
+    if not os.path.exists(path): return None
+    with open(path, encoding="utf-8") as f: state = json.load(f)
+    return state if state.get("until_id") == until_id else None
+
+def save_state(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(state, f)
+    os.replace(tmp, path)
+
+# --- 回補主流程 ---
+def backfill(until_id=None, days=None, workers=WORKERS, rate=RATE, max_pages=MAX_PAGES, state_path=STATE_PATH, fresh=False, log=print):
+    limiter = RateLimiter(rate)
+    head = fetch_page(1, limiter)
+    if not head or not head[0]: raise RuntimeError("第 1 頁抓取失敗或沒有任何期別")
+    head_ids, head_draws = head
+    latest, per_page = head_ids[0], len(head_ids)
+    inserted = draw_store.insert_new(GAME, head_draws)
+    if until_id is None:
+        until_id = max(latest - (days or 1) * DRAWS_PER_DAY, latest // YEAR_SPAN * YEAR_SPAN + 1)
+    known = {int(i) for i in draw_store.known_ids(GAME)}
+
+    state = None if fresh else load_state(state_path, until_id)
+    start, retry = 2, []
+    if state:
+        # 上次之後又開了幾期，頁碼整體往後推；多退一頁保險
+        drift = (latest - state["anchor_id"]) // state["per_page"] if same_year(latest, state["anchor_id"]) else 0
+        start = max(2, state["next_page"] + drift - 1)
+        # 上次失敗的頁先重抓；內容位移後會落在新頁碼與下一頁之間，兩頁都抓
+        retry = sorted({q for p in state.get("failed_pages", []) for q in (p + drift, p + drift + 1) if 2 <= q < start})
+        log(f"接續上次進度：從第 {start} 頁開始 (目標 {until_id})" + (f"，先重抓失敗的 {len(retry)} 頁" if retry else ""))
+    state = {"until_id": until_id, "anchor_id": latest, "per_page": per_page, "next_page": start,
+             "fetched": 1, "skipped": 0, "inserted": inserted, "failed_pages": []}
+
+    pages_seen = {1: head_ids}
+    reached = head_ids[-1] <= until_id
+    page = start
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while retry or (not reached and page <= max_pages):
+            # 湊一批需要抓的頁 (上次失敗的頁排最前面)；推算得出且全部已知的頁直接跳過
+            batch, retry = retry, []
+            while not reached and len(batch) < workers * 2 and page <= max_pages:
+                predicted = predict_ids(page, pages_seen, per_page)
+                if predicted is not None:
+                    if predicted[0] < until_id:
+                        reached = True
+                        break
+                    if all(i in known or i < until_id for i in predicted):
+                        state["skipped"] += 1
+                        pages_seen[page] = predicted
+                        page += 1
+                        continue
+                batch.append(page)
+                page += 1
+            if not batch: break
+
+            for p, result in zip(batch, pool.map(lambda p: fetch_page(p, limiter), batch)):
+                state["fetched"] += 1
+                if result is None:
+                    state["failed_pages"].append(p)
+                    continue
+                ids, draws = result
+                if not ids:
+                    # 空頁：網站歷史到底了
+                    reached = True
+                    continue
+                state["inserted"] += draw_store.insert_new(GAME, draws)
+                known.update(ids)
+                pages_seen[p] = ids
+                if ids[-1] <= until_id: reached = True
+            state["next_page"] = page
+            save_state(state_path, state)
+            log(f"第 {batch[0]}~{batch[-1]} 頁：已抓 {state['fetched']} 頁、跳過 {state['skipped']} 頁、新增 {state['inserted']} 期")
+
+    # 補洞：走訪期間新開獎會讓頁面位移，漏掉的期別依最新頁碼重新定位再抓一次
+    # 沒走到目標 (頁數上限) 時只補已走過的範圍，其餘留給下次接續
+    floor = until_id if reached else max(until_id, min(ids[-1] for ids in pages_seen.values()))
+    gaps = missing_ids(known, latest, floor)
+    if gaps:
+        head = fetch_page(1, limiter)
+        now_latest = head[0][0] if head and head[0] else latest
+        # 抓取期間可能又位移一期，每頁連同下一頁一起抓
+        repair = {(now_latest - i) // per_page + 1 for i in gaps if same_year(i, now_latest)}
+        repair = sorted(repair | {p + 1 for p in repair})
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = [head] + list(pool.map(lambda p: fetch_page(p, limiter), repair))
+        state["fetched"] += len(results)
+        for result in results:
+            if not result: continue
+            state["inserted"] += draw_store.insert_new(GAME, result[1])
+            known.update(result[0])
+        gaps = missing_ids(known, latest, floor)
+
+    state["missing"] = len(gaps)
+    state["done"] = reached and not gaps
+    save_state(state_path, state)
+    return state
+
+def main():
+    parser = argparse.ArgumentParser(description="賓果歷史開獎回補 (寫入 draw_store)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--until-id", type=int, help="回補到這一期 (含)")
+    target.add_argument("--days", type=int, help="回補最近幾天 (以每天 203 期估算)")
+    target.add_argument("--until-date", type=date.fromisoformat, help="回補到這一天 (YYYY-MM-DD，以每天 203 期估算)")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--rate", type=float, default=RATE, help="每秒最多請求數")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES)
+    parser.add_argument("--state", default=STATE_PATH, help="checkpoint 檔")
+    parser.add_argument("--fresh", action="store_true", help="忽略 checkpoint 從頭開始")
+    args = parser.parse_args()
+
+    days = args.days
+    if args.until_date: days = max(1, (date.today() - args.until_date).days + 1)
+    t = time.perf_counter()
+    state = backfill(args.until_id, days, args.workers, args.rate, args.max_pages, args.state, args.fresh)
+    print(f"完成：抓 {state['fetched']} 頁、跳過 {state['skipped']} 頁、新增 {state['inserted']} 期、"
+          f"尚缺 {state['missing']} 期、失敗頁 {state['failed_pages'] or '無'}，{time.perf_counter() - t:.1f}s")
+    return 0 if state["done"] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
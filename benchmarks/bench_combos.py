@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import itertools
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import lotto_combos
+
+SAMPLE = 20000
+
+# 舊版逐組判斷 (bingo_ai3.py 原本的 calculate_ac / is_prime / 生成式)，作為比較基準
+def is_prime(n):
+    if n < 2: return False
+    for i in range(2, int(n**0.5) + 1):
+        if n % i == 0: return False
+    return True
+
+def features_py(combo):
+    diffs = set(abs(a - b) for a, b in itertools.combinations(combo, 2))
+    return (
+        sum(combo),
+        len(diffs) - (len(combo) - 1),
+        sum(1 for n in combo if n % 2 != 0),
+        sum(1 for a, b in zip(combo, combo[1:]) if b - a == 1),
+        sum(1 for n in combo if is_prime(n)),
+        len(set(n // 10 for n in combo)),
+    )
+
+def main():
+    print(f"{'game':<8}{'combos':>11}{'python (/s)':>14}{'kernel (/s)':>14}{'speedup':>10}{'full space (s)':>16}")
+    for game, cfg in lotto_combos.GAMES.items():
+        combos = lotto_combos.enumerate_combos(game)
+        sample = combos[np.random.default_rng(0).choice(len(combos), SAMPLE, replace=False)]
+
+        t = time.perf_counter()
+        expected = [features_py(c) for c in sample.tolist()]
+        py_rate = SAMPLE / (time.perf_counter() - t)
+        feats = lotto_combos.combo_features(sample)
+        assert list(zip(*(feats[name].tolist() for name in lotto_combos.FEATURES))) == expected, game
+
+        t = time.perf_counter()
+        feats = lotto_combos.combo_features(combos)
+        lotto_combos.filter_mask(feats, cfg["rules"])
+        full = time.perf_counter() - t
+        rate = len(combos) / full
+        print(f"{game:<8}{len(combos):>11,}{py_rate:>14,.0f}{rate:>14,.0f}{rate / py_rate:>9.0f}x{full:>16.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import re
+import sys
+import timeit
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import bingo_parser
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+# 舊版 BeautifulSoup 解析 (bingo_ai.py 原本的 fetch_data)，作為比較基準
+def parse_bs4(text):
+    soup = BeautifulSoup(text, 'html.parser')
+    results = []
+    seen_ids = set()
+    for row in soup.find_all('tr'):
+        text = row.get_text(strip=True)
+        id_match = re.search(r'(11[3-9]\d{6})', text)
+        if id_match:
+            draw_id = id_match.group(1)
+            if draw_id in seen_ids: continue
+            nums = re.findall(r'\d+', text)
+            clean_nums = []
+            for n in nums:
+                val = int(n)
+                if str(val) == draw_id: continue
+                if 1 <= val <= 80 and val not in clean_nums: clean_nums.append(val)
+            if len(clean_nums) >= 20:
+                ball_20 = sorted(clean_nums[:20])
+                if ball_20[:5] != [1,2,3,4,5]:
+                    results.append({"id": draw_id, "nums": ball_20})
+                    seen_ids.add(draw_id)
+    return results
+
+def bench(fn, arg, repeat=5):
+    number = max(1, int(0.2 / min(timeit.repeat(lambda: fn(arg), number=1, repeat=3))))
+    return min(timeit.repeat(lambda: fn(arg), number=number, repeat=repeat)) / number
+
+def main():
+    names = sorted(f for f in os.listdir(FIXTURES) if f.startswith("bingo_list"))
+    print(f"{'fixture':<22}{'rows':>6}{'bs4 (ms)':>12}{'fast str (ms)':>15}{'fast bytes (ms)':>17}{'speedup':>10}")
+    for name in names:
+        raw = open(os.path.join(FIXTURES, name), 'rb').read()
+        text = raw.decode('big5')
+        expected = parse_bs4(text)
+        assert bingo_parser.to_draws(*bingo_parser.parse(text)) == expected, name
+        assert bingo_parser.to_draws(*bingo_parser.parse(raw)) == expected, name
+
+        t_bs4 = bench(parse_bs4, text)
+        t_str = bench(bingo_parser.parse, text)
+        # 實際頁面走 res.content，連 Big5 解碼都省掉；基準這邊則要先 decode
+        t_bytes = bench(bingo_parser.parse, raw)
+        t_bs4_total = t_bs4 + bench(lambda b: b.decode('big5'), raw)
+        print(f"{name:<22}{len(expected):>6}{t_bs4 * 1e3:>12.3f}{t_str * 1e3:>15.3f}{t_bytes * 1e3:>17.3f}{t_bs4_total / t_bytes:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import os
+import gc
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import subprocess
+import functools
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import bingo_parser
+import lotto_combos
+from bingo_core import models, backtest, tickets
+
+# 熱點效能回歸測試：爬蟲解析、計分、選號、回測各在 30 / 1k / 100k / 1M 期歷史下計時，
+# 結果存成 JSON，和基準 (results/baseline.json) 比對，變慢超過門檻就列出來並回傳 1。
+#   python benchmarks/bench_suite.py                       # 全部跑一遍並和基準比對
+#   python benchmarks/bench_suite.py --sizes 30 1000       # 只跑小尺寸 (快速檢查)
+#   python benchmarks/bench_suite.py --save-baseline       # 目前結果設為新基準
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+LATEST = os.path.join(RESULTS_DIR, "latest.json")
+SIZES = (30, 1000, 100000, 1000000)
+TICKET_COUNTS = (6, 50, 500)       # 選號不吃歷史長度，改以注數為尺寸
+THRESHOLD = 0.25                   # 比基準慢 25% 以上算回歸
+MIN_TIME = 0.2                     # 每輪至少量這麼久 (秒)
+MY_NUMS = [3, 17, 25, 44, 61]
+
+
+# --- 測試資料 ---
+# 由新到舊的合成開獎 (固定種子)，分批抽號避免 1M x 80 的暫存陣列
+@functools.lru_cache(maxsize=1)
+def history(size):
+    rng = np.random.default_rng(size)
+    nums = np.concatenate([np.sort(rng.random((min(100000, size - i), 80)).argpartition(20, axis=1)[:, :20] + 1, axis=1)
+                           for i in range(0, size, 100000)])
+    ids = 115000000 + size - np.arange(size)
+    return ids, nums.astype(np.int64)
+
+def draws(size):
+    ids, nums = history(size)
+    return [{"id": str(i), "nums": n} for i, n in zip(ids.tolist(), nums.tolist())]
+
+def frame(size):
+    ids, nums = history(size)
+    return pd.DataFrame({"期數": ids, "號碼": nums.tolist()})
+
+# 擷取頁面輪流使用，湊滿 size 期 (頁與頁之間的重複期別不影響計時)
+def pages(size):
+    raw = [open(os.path.join(FIXTURES, f), "rb").read() for f in sorted(os.listdir(FIXTURES)) if f.startswith("bingo_list")]
+    rows = len(bingo_parser.parse(raw[0])[0])
+    return [raw[i % len(raw)] for i in range(-(-size // rows))]
+
+
+# --- 案例：名稱 -> (尺寸, setup(size) 回傳要計時的函式) ---
+def case_parse(size):
+    html = pages(size)
+    return lambda: [bingo_parser.to_draws(*bingo_parser.parse(p)) for p in html]
+
+def case_simulation(method):
+    def setup(size):
+        data = draws(size)
+        return lambda: models.run_simulation(data, method=method)
+    return setup
+
+def case_twin(size):
+    data = draws(size)
+    return lambda: models.twin_scores(data)
+
+def case_ac(size):
+    ranks = np.random.default_rng(size).choice(len(lotto_combos.enumerate_combos("ltobig")), size, replace=size > 100000)
+    combos = lotto_combos.unrank(ranks, "ltobig")
+    return lambda: lotto_combos.combo_features(combos)["ac"]
+
+def case_generate(cover):
+    def setup(count):
+        tickets.combo_index("ltobig")
+        return lambda: tickets.generate_tickets("ltobig", count, cover)
+    return setup
+
+# 回測照頁面的呼叫方式，從 DataFrame 取出欄位再交給 bingo_core.backtest
+def case_backtest12(size):
+    df = frame(size)
+    return lambda: backtest.prize_table(df['期數'].to_numpy(), df['號碼'].tolist(), MY_NUMS, len(MY_NUMS), 1)
+
+def case_backtest25(size):
+    df = frame(size)
+    return lambda: backtest.hit_table(df['期數'].to_numpy(), df['號碼'].tolist(), MY_NUMS)
+
+# 頁面的邏輯已搬進 bingo_core；案例名稱沿用頁面上的函式名，才能和舊基準比對
+# bingo_ai10 (run_digital_twin_logic) 與 bingo_ai11 (run_algorithm) 都改呼叫 models.twin_scores，只量一次
+CASES = {
+    "parse (bingo_parser)": (SIZES, case_parse),
+    "run_simulation mc (bingo_ai)": (SIZES, case_simulation("mc")),
+    "run_simulation exact (bingo_ai)": (SIZES, case_simulation("exact")),
+    "twin_scores (bingo_ai10 / bingo_ai11)": (SIZES, case_twin),
+    "ac features (bingo_ai3)": (SIZES, case_ac),
+    "generate random (bingo_ai3)": (TICKET_COUNTS, case_generate(None)),
+    "generate cover-2 (bingo_ai3)": (TICKET_COUNTS, case_generate(2)),
+    "generate cover-3 (bingo_ai3)": (TICKET_COUNTS, case_generate(3)),
+    "backtest (bingo_ai12)": (SIZES, case_backtest12),
+    "backtest (bingo_ai25)": (SIZES, case_backtest25),
+}
+
+
+# 先跑一次估時間，再決定每輪呼叫幾次；單次就超過 MIN_TIME 的只量 repeat 次單呼叫
+def measure(fn, repeat):
+    t = time.perf_counter()
+    fn()
+    once = time.perf_counter() - t
+    if once >= MIN_TIME: return min([once] + timeit.repeat(fn, number=1, repeat=max(0, repeat - 2)))
+    number = max(1, int(MIN_TIME / max(once, 1e-9)))
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+def git_commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception: return ""
+
+def run(cases, sizes=None, repeat=5, log=print):
+    results = {}
+    for name, (case_sizes, setup) in cases.items():
+        results[name] = {}
+        for size in case_sizes:
+            if sizes and size not in sizes and case_sizes is SIZES: continue
+            fn = setup(size)
+            results[name][str(size)] = measure(fn, repeat)
+            del fn
+            gc.collect()
+            log(f"{name:<38}{size:>10,}{format_time(results[name][str(size)]):>12}")
+    return {"meta": {"time": datetime.now().isoformat(timespec="seconds"), "commit": git_commit(), "python": platform.python_version(),
+                     "numpy": np.__version__, "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpu)"},
+            "results": results}
+
+def format_time(sec):
+    if sec >= 1: return f"{sec:.2f} s"
+    if sec >= 1e-3: return f"{sec * 1e3:.2f} ms"
+    return f"{sec * 1e6:.1f} µs"
+
+# 和基準比對：回傳 [(案例, 尺寸, 基準, 目前, 比值)]，只列兩邊都有的項目
+def compare(current, baseline):
+    rows = []
+    for name, sizes in current["results"].items():
+        for size, sec in sizes.items():
+            base = baseline["results"].get(name, {}).get(size)
+            if base: rows.append((name, size, base, sec, sec / base))
+    return rows
+
+def save(path, result):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f: json.dump(result, f, ensure_ascii=False, indent=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="熱點效能回歸測試")
+    parser.add_argument("--sizes", type=int, nargs="*", help=f"歷史期數 (預設 {' '.join(map(str, SIZES))})")
+    parser.add_argument("--cases", nargs="*", help="只跑名稱含有這些字的案例")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--output", default=LATEST)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="比基準慢多少比例算回歸")
+    parser.add_argument("--save-baseline", action="store_true", help="把這次結果存成基準")
+    args = parser.parse_args()
+
+    cases = {k: v for k, v in CASES.items() if not args.cases or any(c in k for c in args.cases)}
+    print(f"{'case':<38}{'size':>10}{'time':>12}")
+    result = run(cases, args.sizes, args.repeat)
+    save(args.output, result)
+    if args.save_baseline:
+        save(args.baseline, result)
+        print(f"已存為基準：{args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"沒有基準 ({args.baseline})，結果存在 {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+    rows = compare(result, baseline)
+    regressions = [r for r in rows if r[4] > 1 + args.threshold]
+    print(f"\n基準：{baseline['meta'].get('commit') or '?'} ({baseline['meta'].get('time')})")
+    print(f"{'case':<38}{'size':>10}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, size, base, sec, ratio in rows:
+        flag = "  <-- 變慢" if ratio > 1 + args.threshold else ""
+        print(f"{name:<38}{int(size):>10,}{format_time(base):>12}{format_time(sec):>12}{ratio:>7.2f}x{flag}")
+    print(f"\n{len(regressions)} 項比基準慢超過 {args.threshold:.0%}" if regressions else "\n沒有回歸")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,12 @@
 import streamlit as st
-import requests
-import re
 import pandas as pd
-from datetime import datetime
 import time
 import urllib3
-from bs4 import BeautifulSoup
-from collections import Counter
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+import history_cache
+import perf_trace
+from bingo_core import models, charts
+from bingo_core.history import fetch_bingo
 
 # 1. 系統設定
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -100,121 +97,79 @@ st.markdown("""
 if 'history_data' not in st.session_state: st.session_state.history_data = []
 if 'last_run_time' not in st.session_state: st.session_state.last_run_time = time.time()
 if 'sim_results' not in st.session_state: st.session_state.sim_results = None
+if 'solver' not in st.session_state: st.session_state.solver = "蒙地卡羅模擬"
 
 # --- 1. 核心抓取 ---
-def fetch_data():
-    url = "https://www.pilio.idv.tw/bingo/list.asp"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        res = requests.get(url, headers=headers, timeout=10, verify=False)
-        res.encoding = 'big5'
-        if res.status_code != 200: return []
-        
-        soup = BeautifulSoup(res.text, 'html.parser')
-        rows = soup.find_all('tr')
-        results = []
-        seen_ids = set()
-        
-        for row in rows:
-            text = row.get_text(strip=True)
-            id_match = re.search(r'(11[5-6]\d{6})', text)
-            if id_match:
-                draw_id = id_match.group(1)
-                if not (115000000 < int(draw_id) < 116000000): continue
-                if draw_id in seen_ids: continue
-                nums = re.findall(r'\d+', text)
-                clean_nums = []
-                for n in nums:
-                    val = int(n)
-                    if str(val) == draw_id: continue
-                    if 1 <= val <= 80 and val not in clean_nums: clean_nums.append(val)
-                if len(clean_nums) >= 20:
-                    ball_20 = sorted(clean_nums[:20])
-                    if ball_20[:5] != [1,2,3,4,5]:
-                        results.append({"id": draw_id, "nums": ball_20})
-                        seen_ids.add(draw_id)
-        return results[:30]
-    except:
-        return []
+HISTORY_DEPTH = 30
 
-# --- 2. 蒙地卡羅模擬 + 多維分析 ---
-def run_simulation(data):
-    if not data: return None, None, None, None
-    
-    probs = np.ones(81) * 1.0 
-    all_nums = [n for d in data for n in d['nums']]
-    counts = Counter(all_nums)
-    last_draw = data[0]['nums']
-    
-    # 屬性分數 (用於雷達圖)
-    # 格式: {num: {'hot': v, 'repeat': v, 'gravity': v, 'chaos': v}}
-    attr_scores = {}
-    
-    for n in range(1, 81):
-        # 1. 熱度 (Frequency)
-        hot_score = counts[n] * 2.5
-        probs[n] += hot_score
-        
-        # 2. 連莊 (Momentum)
-        rep_score = 20.0 if n in last_draw else 0
-        probs[n] += rep_score
-        
-        # 3. 重力 (Gravity)
-        grav_score = (counts.get(n-1, 0) + counts.get(n+1, 0)) * 0.5
-        probs[n] += grav_score
-        
-        # 4. 混沌 (Chaos)
-        chaos_score = np.random.uniform(0, 5)
-        probs[n] += chaos_score
-        
-        # 記錄屬性 (正規化後用於繪圖)
-        attr_scores[n] = [hot_score, rep_score, grav_score, chaos_score]
+# 回傳 (draws, 來源)；抓取失敗時 draws 仍是資料庫裡的歷史
+def fetch_data(depth=HISTORY_DEPTH):
+    return fetch_bingo(depth, app="bingo_ai")[:2]
 
-    weights = probs[1:] 
-    weight_sum = np.sum(weights)
-    weights = weights / weight_sum if weight_sum > 0 else np.ones(80)/80
-    population = np.arange(1, 81)
-    
-    # 模擬 10,000 次
-    sim_counts = Counter()
-    for _ in range(10000):
-        draw = np.random.choice(population, size=20, replace=False, p=weights)
-        sim_counts.update(draw)
-    
-    top_3 = [n for n, c in sim_counts.most_common(3)]
-    rates = {n: (sim_counts[n] / 10000) * 100 for n in top_3}
-    
-    return top_3, rates, dict(sim_counts), attr_scores
+# --- 2. 推演引擎 (bingo_core.models.run_simulation)：蒙地卡羅模擬或解析解 ---
+SOLVERS = {"蒙地卡羅模擬": "mc", "解析解 (精確機率)": "exact"}
+
+# 結果只由歷史與引擎決定 (以最新期號為種子)，同一期的重整與其他 session 直接沿用
+@st.cache_data(max_entries=16, show_spinner=False)
+def simulate(data, method):
+    return models.run_simulation(data, method=method)
 
 # --- 3. 更新與 UI ---
-def update():
-    data = fetch_data()
+def analyze():
+    data = st.session_state.history_data
+    with perf_trace.stage("bingo_ai", "compute"):
+        top_3, rates, raw_sims, attrs = simulate(data, SOLVERS[st.session_state.solver])
+    if top_3:
+        # raw：各號碼模擬開出次數 (解析解為期望次數)，見 models.run_simulation
+        st.session_state.sim_results = {"top_3": top_3, "rates": rates, "raw": raw_sims, "attrs": attrs}
+
+def update(force=False):
+    # 所有 session 共用同一份歷史，到下一期開獎前不重抓
+    # 只有上游正常回應才快取到下一期，失敗的結果 FAILURE_TTL 後就重抓
+    data, _ = history_cache.get("bingo_ai", fetch_data, ok=lambda r: r[1] in ("live", "unchanged"), force=force)
     if data:
         st.session_state.history_data = data
         st.session_state.last_run_time = time.time()
-        top_3, rates, raw_sims, attrs = run_simulation(data)
-        if top_3:
-            st.session_state.sim_results = {"top_3": top_3, "rates": rates, "raw": raw_sims, "attrs": attrs}
+        analyze()
         return True
     return False
 
+# 自動同步：只有倒數這個片段每秒重跑，整頁只在抓到新一期時才重建
+REFRESH_SECONDS = 300
+
+@st.fragment(run_every=1)
+def sync_countdown():
+    diff = time.time() - st.session_state.last_run_time
+    if diff > REFRESH_SECONDS:
+        history = st.session_state.history_data
+        prev_id = history[0]['id'] if history else None
+        update()
+        # 抓取失敗也重新計時，避免每秒打上游
+        st.session_state.last_run_time = time.time()
+        history = st.session_state.history_data
+        if history and history[0]['id'] != prev_id: st.rerun()
+        diff = 0
+    st.caption(f"下次同步：{REFRESH_SECONDS - int(diff)}s")
+
 # --- 介面呈現 ---
 st.markdown("<div class='nebula-header'>🌌 NEBULA ORACLE: AI SYSTEM</div>", unsafe_allow_html=True)
 
 if not st.session_state.history_data:
     with st.spinner("正在穿越事件視界..."):
         update()
+render = perf_trace.start("bingo_ai", "render")
 
 # 側邊欄
 with st.sidebar:
     st.markdown("### 🌌 神諭控制台")
     if st.button("🚀 啟動預知模擬", type="primary"):
-        update()
+        update(force=True)
         st.rerun()
+    # 換引擎只重算，不重抓
+    st.radio("推演引擎", list(SOLVERS), key="solver", on_change=analyze)
     auto = st.checkbox("自動同步", value=True)
     if auto:
-        diff = time.time() - st.session_state.last_run_time
-        st.caption(f"下次同步：{300 - int(diff)}s")
+        sync_countdown()
 
 # 主畫面
 if st.session_state.sim_results:
@@ -246,36 +201,9 @@ if st.session_state.sim_results:
     
     with col_chart:
         st.subheader("🕸️ AI 推理雷達 (Why Selected?)")
-        # 準備雷達圖數據
-        categories = ['熱度 (Hot)', '連莊 (Repeat)', '重力 (Gravity)', '混沌 (Chaos)']
-        fig = go.Figure()
-        
-        # 繪製前三名的屬性
-        colors = ['#d946ef', '#8b5cf6', '#06b6d4']
-        for i, n in enumerate(top_3):
-            # 正規化數據以便繪圖
-            vals = attrs[n]
-            max_val = max(vals) if max(vals) > 0 else 1
-            vals_norm = [v/max_val for v in vals]
-            
-            fig.add_trace(go.Scatterpolar(
-                r=vals_norm,
-                theta=categories,
-                fill='toself',
-                name=f'號碼 {n:02d}',
-                line_color=colors[i],
-                opacity=0.6
-            ))
-
-        fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[0, 1], showticklabels=False), bgcolor='#0f172a'),
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            margin=dict(l=40, r=40, t=20, b=20),
-            height=300,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
-        )
+        # 同一期只建一次 (倒數每秒 rerun 也直接沿用)
+        categories = charts.RADAR_CATEGORIES
+        fig = charts.radar(latest_id, top_3, attrs, depth=len(st.session_state.history_data))
         st.plotly_chart(fig, use_container_width=True)
         
     with col_desc:
@@ -321,13 +249,11 @@ if st.session_state.sim_results:
         }
     )
     
-    # 底部狀態列
-    st.markdown(f"<div style='text-align:center; color:#555; font-size:0.8em; margin-top:20px;'>NEBULA ORACLE SYSTEM v3.0 | CONNECTION STABLE | LATENCY: 24ms</div>", unsafe_allow_html=True)
+    # 底部狀態列：最近一次上游請求的實測延遲
+    latency = perf_trace.upstream_latency("bingo_ai")
+    latency = f"{latency:.0f}ms" if latency is not None else "N/A (資料庫快取)"
+    st.markdown(f"<div style='text-align:center; color:#555; font-size:0.8em; margin-top:20px;'>NEBULA ORACLE SYSTEM v3.0 | CONNECTION STABLE | LATENCY: {latency}</div>", unsafe_allow_html=True)
 
-# 自動刷新
-time.sleep(1)
-if time.time() - st.session_state.last_run_time > 300:
-    update()
-    st.rerun()
-else:
-    st.rerun()
\ No newline at end of file
+# 效能診斷 (側欄)
+render.stop()
+perf_trace.sidebar_panel("bingo_ai")
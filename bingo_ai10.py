@@ -1,15 +1,11 @@
 import streamlit as st
-import requests
-import re
 import pandas as pd
-from datetime import datetime
 import time
 import urllib3
-from bs4 import BeautifulSoup
-from collections import Counter
-import numpy as np
-import plotly.graph_objects as go
-import random
+from bingo_features import CoOccurrence, GapIndex
+import history_cache
+import perf_trace
+from bingo_core import history, models, charts
 
 # 1. 系統設定
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -118,113 +114,23 @@ if 'history_data' not in st.session_state: st.session_state.history_data = []
 if 'final_result' not in st.session_state: st.session_state.final_result = None
 if 'data_status' not in st.session_state: st.session_state.data_status = "Init"
 
-# --- 1. 核心抓取 ---
-def generate_mock_data():
-    mock_data = []
-    base_id = 115008000
-    for i in range(80):
-        draw = sorted(random.sample(range(1, 81), 20))
-        mock_data.append({"id": str(base_id - i), "nums": draw})
-    return mock_data
+# --- 1. 核心抓取 (抓取失敗先用本地歷史，資料庫也不足才退回模擬資料) ---
+HISTORY_DEPTH = 80
 
-def fetch_data():
-    url = "https://www.pilio.idv.tw/bingo/list.asp"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        res = requests.get(url, headers=headers, timeout=5, verify=False)
-        res.encoding = 'big5'
-        if res.status_code != 200: 
-            return generate_mock_data(), "⚠️ 離線模擬 (連線失敗)"
-        
-        soup = BeautifulSoup(res.text, 'html.parser')
-        rows = soup.find_all('tr')
-        results = []
-        seen_ids = set()
-        for row in rows:
-            text = row.get_text(strip=True)
-            id_match = re.search(r'(11[5-6]\d{6})', text)
-            if id_match:
-                draw_id = id_match.group(1)
-                if draw_id in seen_ids: continue
-                nums = re.findall(r'\d+', text)
-                clean_nums = []
-                for n in nums:
-                    val = int(n)
-                    if str(val) == draw_id: continue
-                    if 1 <= val <= 80 and val not in clean_nums: clean_nums.append(val)
-                if len(clean_nums) >= 20:
-                    ball_20 = sorted(clean_nums[:20])
-                    results.append({"id": draw_id, "nums": ball_20})
-                    seen_ids.add(draw_id)
-        
-        if len(results) < 10: return generate_mock_data(), "⚠️ 離線模擬 (資料不足)"
-        return results[:80], "✅ 連線正常 (Live Data)"
-    except:
-        return generate_mock_data(), "⚠️ 離線模擬 (網路異常)"
-
-# --- 2. 數位雙生演算法 ---
-def run_digital_twin_logic(data):
-    try: latest_id = int(data[0]['id'])
-    except: latest_id = 12345
-    np.random.seed(latest_id)
-    
-    all_nums = [n for d in data for n in d['nums']]
-    counts = Counter(all_nums)
-    last_draw = data[0]['nums']
-    
-    co_matrix = np.zeros((81, 81))
-    for draw in data:
-        nums = draw['nums']
-        for i in range(len(nums)):
-            for j in range(i+1, len(nums)):
-                co_matrix[nums[i]][nums[j]] += 1
-                co_matrix[nums[j]][nums[i]] += 1
-
-    scores = {n: 0.0 for n in range(1, 81)}
-    for n in range(1, 81):
-        scores[n] += counts[n] * 3.0
-        gravity = 0
-        if (n-1) in last_draw: gravity += 10
-        if (n+1) in last_draw: gravity += 10
-        for prev in last_draw: gravity += co_matrix[prev][n] * 0.2
-        scores[n] += gravity
-        curr_gap = 0
-        for i, draw in enumerate(data):
-            if n in draw['nums']:
-                curr_gap = i
-                break
-            curr_gap = i + 1
-        avg_gap = 80 / (counts[n] if counts[n] > 0 else 1)
-        if curr_gap > avg_gap: scores[n] += 15
-        scores[n] += np.random.uniform(0, 5)
-
-    top_3 = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)[:3]
-    
-    features = []
-    for n in range(1, 81):
-        features.append({
-            "num": n,
-            "freq": counts[n],
-            "gap": next((i for i, d in enumerate(data) if n in d['nums']), len(data)),
-            "score": scores[n],
-            "is_top": n in top_3
-        })
-    df_feat = pd.DataFrame(features)
-    probs = {n: int(min(99, (scores[n]/scores[top_3[0]])*95)) for n in top_3}
-    
-    return {
-        "top_3": top_3,
-        "df_feat": df_feat,
-        "probs": probs
-    }
+def fetch_data(depth=HISTORY_DEPTH):
+    return history.fetch_with_fallback(depth, app="bingo_ai10")
 
 # --- 3. 更新與 UI ---
-def update():
-    data, status = fetch_data()
+def update(force=False):
+    # 所有 session 共用同一份歷史，到下一期開獎前不重抓；離線/模擬資料很快就會重試
+    data, status = history_cache.get("bingo_ai10", fetch_data, ok=lambda r: r[1].startswith("✅"), force=force)
     st.session_state.data_status = status
     if data:
         st.session_state.history_data = data
-        res = run_digital_twin_logic(data)
+        if 'co_index' not in st.session_state: st.session_state.co_index = CoOccurrence(window=HISTORY_DEPTH)
+        if 'gap_index' not in st.session_state: st.session_state.gap_index = GapIndex()
+        with perf_trace.stage("bingo_ai10", "compute"):
+            res = models.twin_scores(data, st.session_state.co_index, st.session_state.gap_index)
         if res:
             st.session_state.final_result = res
         return True
@@ -238,13 +144,14 @@ with st.sidebar:
     st.markdown("### 💠 實戰控制台")
     st.write(f"連線狀態：{st.session_state.data_status}")
     if st.button("🚀 重啟運算", type="primary"):
-        update()
+        update(force=True)
         st.rerun()
     auto = st.checkbox("自動同步", value=True)
 
 if not st.session_state.final_result:
     with st.spinner("正在進行平行宇宙模擬與策略拆解..."):
         update()
+render = perf_trace.start("bingo_ai10", "render")
 
 if st.session_state.final_result:
     res = st.session_state.final_result
@@ -267,20 +174,11 @@ if st.session_state.final_result:
     with c3: st.markdown(f"<div class='twin-ball'>{top_3[2]:02d}</div><div class='prob-tag'>機率 {probs[top_3[2]]}%</div>", unsafe_allow_html=True)
 
     # 3D 空間 (保留視覺化)
-    with st.expander("查看 3D 號碼能量分佈圖 (點擊展開)"):
-        fig = go.Figure(data=[go.Scatter3d(
-            x=df_feat['freq'], y=df_feat['gap'], z=df_feat['score'],
-            mode='markers+text',
-            marker=dict(
-                size=[15 if x else 5 for x in df_feat['is_top']],
-                color=['#ff0000' if x else '#00f2ff' for x in df_feat['is_top']],
-                opacity=0.8
-            ),
-            text=[str(n) if t else "" for n, t in zip(df_feat['num'], df_feat['is_top'])],
-            textfont=dict(color='white', size=15)
-        )])
-        fig.update_layout(scene = dict(xaxis_title='熱度', yaxis_title='遺漏', zaxis_title='能量', xaxis=dict(backgroundcolor="black"), yaxis=dict(backgroundcolor="black"), zaxis=dict(backgroundcolor="black")), paper_bgcolor='black', height=400, margin=dict(l=0,r=0,b=0,t=0))
-        st.plotly_chart(fig, use_container_width=True)
+    # 收合時不建圖；展開後同一期的圖跨 rerun / session 共用
+    energy = st.expander("查看 3D 號碼能量分佈圖 (點擊展開)", key="energy_3d", on_change="rerun")
+    if energy.open:
+        with energy:
+            st.plotly_chart(charts.energy_3d(latest_id, df_feat, depth=HISTORY_DEPTH), use_container_width=True)
 
     # 策略損益分析 (重點修改區域)
     st.markdown("---")
@@ -335,4 +233,8 @@ if st.session_state.final_result:
     df = pd.DataFrame(st.session_state.history_data)
     df['總分'] = df['nums'].apply(sum)
     df['號碼'] = df['nums'].apply(lambda x: " ".join([f"{n:02d}" for n in x]))
-    st.dataframe(df[['id', '總分', '號碼']], use_container_width=True, hide_index=True)
\ No newline at end of file
+    st.dataframe(df[['id', '總分', '號碼']], use_container_width=True, hide_index=True)
+
+# 效能診斷 (側欄)
+render.stop()
+perf_trace.sidebar_panel("bingo_ai10")
@@ -1,15 +1,13 @@
 import streamlit as st
-import requests
-import re
 import pandas as pd
-from datetime import datetime
 import time
 import urllib3
-from bs4 import BeautifulSoup
-from collections import Counter
-import numpy as np
-import plotly.graph_objects as go
-import random
+import itertools
+from bingo_features import CoOccurrence, GapIndex
+import history_cache
+import perf_trace
+from bingo_core import history, models, charts
+import bingo_odds
 
 # 1. 系統設定
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -128,109 +126,23 @@ if 'history_data' not in st.session_state: st.session_state.history_data = []
 if 'final_result' not in st.session_state: st.session_state.final_result = None
 if 'data_status' not in st.session_state: st.session_state.data_status = "Waiting..."
 
-# --- 1. 核心抓取 (含備援) ---
-def generate_mock_data():
-    mock_data = []
-    base_id = 115008000
-    for i in range(80):
-        draw = sorted(random.sample(range(1, 81), 20))
-        mock_data.append({"id": str(base_id - i), "nums": draw})
-    return mock_data
+# --- 1. 核心抓取 (含備援：抓取失敗先用本地歷史，資料庫也不足才退回模擬資料) ---
+HISTORY_DEPTH = 80
 
-def fetch_data():
-    url = "https://www.pilio.idv.tw/bingo/list.asp"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    try:
-        res = requests.get(url, headers=headers, timeout=5, verify=False)
-        res.encoding = 'big5'
-        if res.status_code != 200: 
-            return generate_mock_data(), "⚠️ 離線模擬 (連線失敗)"
-        
-        soup = BeautifulSoup(res.text, 'html.parser')
-        rows = soup.find_all('tr')
-        results = []
-        seen_ids = set()
-        for row in rows:
-            text = row.get_text(strip=True)
-            id_match = re.search(r'(11[5-6]\d{6})', text)
-            if id_match:
-                draw_id = id_match.group(1)
-                if draw_id in seen_ids: continue
-                nums = re.findall(r'\d+', text)
-                clean_nums = []
-                for n in nums:
-                    val = int(n)
-                    if str(val) == draw_id: continue
-                    if 1 <= val <= 80 and val not in clean_nums: clean_nums.append(val)
-                if len(clean_nums) >= 20:
-                    ball_20 = sorted(clean_nums[:20])
-                    results.append({"id": draw_id, "nums": ball_20})
-                    seen_ids.add(draw_id)
-        
-        if len(results) < 10: return generate_mock_data(), "⚠️ 離線模擬 (資料不足)"
-        return results[:80], "✅ 連線正常 (Live Data)"
-    except:
-        return generate_mock_data(), "⚠️ 離線模擬 (網路異常)"
-
-# --- 2. 數位雙生演算法 ---
-def run_algorithm(data):
-    try: latest_id = int(data[0]['id'])
-    except: latest_id = 12345
-    np.random.seed(latest_id)
-    
-    all_nums = [n for d in data for n in d['nums']]
-    counts = Counter(all_nums)
-    last_draw = data[0]['nums']
-    
-    # 共現矩陣
-    co_matrix = np.zeros((81, 81))
-    for draw in data:
-        nums = draw['nums']
-        for i in range(len(nums)):
-            for j in range(i+1, len(nums)):
-                co_matrix[nums[i]][nums[j]] += 1
-                co_matrix[nums[j]][nums[i]] += 1
-
-    scores = {n: 0.0 for n in range(1, 81)}
-    for n in range(1, 81):
-        scores[n] += counts[n] * 3.0
-        gravity = 0
-        if (n-1) in last_draw: gravity += 10
-        if (n+1) in last_draw: gravity += 10
-        for prev in last_draw: gravity += co_matrix[prev][n] * 0.2
-        scores[n] += gravity
-        curr_gap = 0
-        for i, draw in enumerate(data):
-            if n in draw['nums']:
-                curr_gap = i
-                break
-            curr_gap = i + 1
-        avg_gap = 80 / (counts[n] if counts[n] > 0 else 1)
-        if curr_gap > avg_gap: scores[n] += 15
-        scores[n] += np.random.uniform(0, 5)
-
-    top_3 = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)[:3]
-    
-    # 3D 數據
-    features = []
-    for n in range(1, 81):
-        features.append({
-            "num": n, "freq": counts[n], 
-            "gap": next((i for i, d in enumerate(data) if n in d['nums']), len(data)),
-            "score": scores[n], "is_top": n in top_3
-        })
-    df_feat = pd.DataFrame(features)
-    probs = {n: int(min(99, (scores[n]/scores[top_3[0]])*95)) for n in top_3}
-    
-    return {"top_3": top_3, "df_feat": df_feat, "probs": probs}
+def fetch_data(depth=HISTORY_DEPTH):
+    return history.fetch_with_fallback(depth, app="bingo_ai11")
 
 # --- 3. 更新與 UI ---
-def update():
-    data, status = fetch_data()
+def update(force=False):
+    # 所有 session 共用同一份歷史，到下一期開獎前不重抓；離線/模擬資料很快就會重試
+    data, status = history_cache.get("bingo_ai11", fetch_data, ok=lambda r: r[1].startswith("✅"), force=force)
     st.session_state.data_status = status
     if data:
         st.session_state.history_data = data
-        res = run_algorithm(data)
+        if 'co_index' not in st.session_state: st.session_state.co_index = CoOccurrence(window=HISTORY_DEPTH)
+        if 'gap_index' not in st.session_state: st.session_state.gap_index = GapIndex()
+        with perf_trace.stage("bingo_ai11", "compute"):
+            res = models.twin_scores(data, st.session_state.co_index, st.session_state.gap_index)
         if res:
             st.session_state.final_result = res
         return True
@@ -239,8 +151,10 @@ def update():
 # 自動執行檢查
 if st.session_state.final_result is None or st.session_state.data_status == "Waiting...":
     update()
+render = perf_trace.start("bingo_ai11", "render")
 
 # --- 介面呈現 ---
+CAMPAIGN_PERIODS = 10   # 波段期數
 st.markdown("<div class='twin-header'>DIGITAL TWIN: 4X STRATEGY</div>", unsafe_allow_html=True)
 
 # 側邊欄
@@ -248,7 +162,7 @@ with st.sidebar:
     st.markdown("### 💠 系統狀態")
     st.code(st.session_state.data_status)
     if st.button("🔄 強制重刷", type="primary"):
-        update()
+        update(force=True)
         st.rerun()
 
 if st.session_state.final_result:
@@ -261,7 +175,7 @@ if st.session_state.final_result:
     # HUD
     st.markdown(f"""
     <div class='sim-box'>
-        > <b>目標期別</b>：{int(latest_id)+1} ~ {int(latest_id)+10} 期 (10期波段)<br>
+        > <b>目標期別</b>：{int(latest_id)+1} ~ {int(latest_id)+CAMPAIGN_PERIODS} 期 ({CAMPAIGN_PERIODS}期波段)<br>
         > <b>推薦策略</b>：<span style='color:#00f2ff'>4倍三星重注 (4x 3-Star)</span><br>
         > <b>鎖定號碼</b>：{top_3}
     </div>
@@ -274,47 +188,47 @@ if st.session_state.final_result:
     with c3: st.markdown(f"<div class='twin-ball'>{top_3[2]:02d}</div><div class='prob-tag'>AI 信心度 {probs[top_3[2]]}%</div>", unsafe_allow_html=True)
 
     # 3D 空間
-    with st.expander("🌌 查看 3D 號碼能量分佈 (點擊展開)"):
-        fig = go.Figure(data=[go.Scatter3d(
-            x=df_feat['freq'], y=df_feat['gap'], z=df_feat['score'],
-            mode='markers+text',
-            marker=dict(
-                size=[15 if x else 5 for x in df_feat['is_top']],
-                color=['#ff0000' if x else '#00f2ff' for x in df_feat['is_top']],
-                opacity=0.8
-            ),
-            text=[str(n) if t else "" for n, t in zip(df_feat['num'], df_feat['is_top'])],
-            textfont=dict(color='white', size=15)
-        )])
-        fig.update_layout(scene = dict(xaxis_title='熱度', yaxis_title='遺漏', zaxis_title='能量', xaxis=dict(backgroundcolor="black"), yaxis=dict(backgroundcolor="black"), zaxis=dict(backgroundcolor="black")), paper_bgcolor='black', height=400, margin=dict(l=0,r=0,b=0,t=0))
-        st.plotly_chart(fig, use_container_width=True)
+    # 收合時不建圖；展開後同一期的圖跨 rerun / session 共用
+    energy = st.expander("🌌 查看 3D 號碼能量分佈 (點擊展開)", key="energy_3d", on_change="rerun")
+    if energy.open:
+        with energy:
+            st.plotly_chart(charts.energy_3d(latest_id, df_feat, depth=HISTORY_DEPTH), use_container_width=True)
 
-    # 💰 策略比較 (修正後的正確數學)
+    # 💰 策略比較 (超幾何機率 x 獎金表的精確計算)
     st.markdown("---")
-    st.subheader("💰 10期波段策略分析 (The Mathematical Winner)")
+    st.subheader(f"💰 {CAMPAIGN_PERIODS}期波段策略分析 (The Mathematical Winner)")
+    bankroll = st.number_input("波段本金 (元)", min_value=100, max_value=100000, value=500, step=100)
     
     col_strat_a, col_strat_b = st.columns(2)
     
-    # 策略數據
-    # 方案 A: 3星x4注 (成本100)
-    # 中2碼: 50 * 4 = 200 (賺100)
-    # 中3碼: 500 * 4 = 2000 (賺1900)
-    
-    # 方案 B: 3星x1注 + 2星x3注 (成本100)
-    # 中2碼: 50(3星) + 75(2星) = 125 (賺25)
-    # 中3碼: 500(3星) + 225(2星) = 725 (賺625)
+    # 方案 A: 3星 4倍 (成本100)；方案 B: 3星x1注 + 同組號碼的三注二星 (成本100)
+    plan_a = [(tuple(top_3), 4)]
+    plan_b = [(tuple(top_3), 1)] + [(pair, 1) for pair in itertools.combinations(top_3, 2)]
+    stats_a = bingo_odds.evaluate_strategy(plan_a, CAMPAIGN_PERIODS, bankroll)
+    stats_b = bingo_odds.evaluate_strategy(plan_b, CAMPAIGN_PERIODS, bankroll)
+    pay_a = [bingo_odds.payout(plan_a, top_3[:h]) for h in (2, 3)]
+    pay_b = [bingo_odds.payout(plan_b, top_3[:h]) for h in (2, 3)]
+
+    def strategy_stats(stats):
+        return f"""
+            <ul>
+                <li>期望損益 <b>{stats['ev']:+,.0f}</b> (標準差 {stats['std']:,.0f})</li>
+                <li>每期有獎機率 {stats['hit_prob']:.1%}，波段獲利機率 <b>{stats['p_profit']:.1%}</b></li>
+                <li>本金 ${bankroll:,} 撐不完 {CAMPAIGN_PERIODS} 期的機率 <b>{stats['p_ruin']:.1%}</b></li>
+            </ul>"""
 
     with col_strat_a:
         st.markdown(f"""
         <div class='strategy-card strategy-winner'>
             <div class='card-title' style='color:#00f2ff;'>🏆 方案 A：4倍三星 (絕對優勢)</div>
-            <p>每期買 4 注三星 (成本 $100)。</p>
+            <p>每期買 4 倍三星 (成本 $100)。</p>
             <ul>
-                <li><b>中 2 碼</b>：領 $200 <span class='profit-text'>(淨利 +100)</span></li>
-                <li><b>中 3 碼</b>：領 $2,000 <span class='profit-text'>(淨利 +1,900)</span></li>
+                <li><b>中 2 碼</b>：領 ${pay_a[0]:,} <span class='profit-text'>(淨利 {pay_a[0] - 100:+,})</span></li>
+                <li><b>中 3 碼</b>：領 ${pay_a[1]:,} <span class='profit-text'>(淨利 {pay_a[1] - 100:+,})</span></li>
             </ul>
+            {strategy_stats(stats_a)}
             <p style='color:#00f2ff; font-weight:bold;'>
-                AI 結論：完勝。因為三星中2碼有獎金 ($50)，買 4 倍放大後，連「防禦力」都比方案 B 強！
+                AI 結論：三星中2碼有獎金 ($50)，買 4 倍放大後，中 3 碼的爆發力遠勝方案 B。
             </p>
         </div>
         """, unsafe_allow_html=True)
@@ -323,45 +237,40 @@ if st.session_state.final_result:
         st.markdown(f"""
         <div class='strategy-card'>
             <div class='card-title' style='color:#888;'>方案 B：二星混買 (已過時)</div>
-            <p>1 注三星 + 3 注二星 (成本 $100)。</p>
+            <p>1 注三星 + 同組號碼 3 注二星 (成本 $100)。</p>
             <ul>
-                <li><b>中 2 碼</b>：領 $125 <span class='profit-text'>(淨利 +25)</span></li>
-                <li><b>中 3 碼</b>：領 $725 <span class='profit-text'>(淨利 +625)</span></li>
+                <li><b>中 2 碼</b>：領 ${pay_b[0]:,} <span class='profit-text'>(淨利 {pay_b[0] - 100:+,})</span></li>
+                <li><b>中 3 碼</b>：領 ${pay_b[1]:,} <span class='profit-text'>(淨利 {pay_b[1] - 100:+,})</span></li>
             </ul>
+            {strategy_stats(stats_b)}
             <p style='color:#888;'>
-                缺點：混買二星反而稀釋了獲利。既然三星本身就保本，不需要再買二星來避險。
+                缺點：混買二星中獎較頻繁、波動較小，但稀釋了中 3 碼的獲利。
             </p>
         </div>
         """, unsafe_allow_html=True)
 
-    # 獲利比較圖
-    fig_roi = go.Figure()
-    fig_roi.add_trace(go.Bar(
-        x=['中2碼 (防禦)', '中3碼 (進攻)'],
-        y=[200, 2000],
-        name='方案 A (4倍三星)',
-        marker_color='#00f2ff',
-        text=['$200', '$2000'],
-        textposition='auto'
-    ))
-    fig_roi.add_trace(go.Bar(
-        x=['中2碼 (防禦)', '中3碼 (進攻)'],
-        y=[125, 725],
-        name='方案 B (混買)',
-        marker_color='#555',
-        text=['$125', '$725'],
-        textposition='auto'
-    ))
-    fig_roi.update_layout(
-        title="單期獲利能力比較 (同樣成本 $100)",
-        plot_bgcolor='#111',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='white'),
-        yaxis_title="獎金 (元)",
-        barmode='group'
-    )
+    # 獲利比較圖 (附上單期機率)
+    hit_probs = [bingo_odds.HIT_PROB[3, 2], bingo_odds.HIT_PROB[3, 3]]
+    labels = [f'中2碼 (防禦) {hit_probs[0]:.1%}', f'中3碼 (進攻) {hit_probs[1]:.2%}']
+    fig_roi = charts.roi_bars(labels, pay_a, pay_b)
     st.plotly_chart(fig_roi, use_container_width=True)
 
+    # 單注風險表：1~10 星 x 1~100 倍 x 1~100 期整張表只算一次
+    with st.expander("📐 星數 x 倍數 x 期數 風險表"):
+        g1, g2 = st.columns(2)
+        grid_mult = g1.slider("倍數", 1, 100, 1)
+        grid_periods = g2.slider("期數", 1, 100, CAMPAIGN_PERIODS)
+        grid = bingo_odds.star_grid(bankroll=int(bankroll))
+        m, n = grid_mult - 1, grid_periods - 1
+        st.dataframe(pd.DataFrame({
+            "星數": [f"{k} 星" for k in range(1, 11)],
+            "總成本": [25 * grid_mult * grid_periods] * 10,
+            "期望損益": grid["ev"][:, m, n].round(0),
+            "標準差": grid["std"][:, m, n].round(0),
+            "獲利機率": (grid["p_profit"][:, m, n] * 100).round(2),
+            "破產機率": (grid["p_ruin"][:, m, n] * 100).round(2),
+        }), use_container_width=True, hide_index=True)
+
     # 歷史表格
     st.markdown("---")
     df = pd.DataFrame(st.session_state.history_data)
@@ -370,4 +279,8 @@ if st.session_state.final_result:
     st.dataframe(df[['id', '總分', '號碼']], use_container_width=True, hide_index=True)
 
 else:
-    st.info("系統正在啟動中，請稍候...")
\ No newline at end of file
+    st.info("系統正在啟動中，請稍候...")
+
+# 效能診斷 (側欄)
+render.stop()
+perf_trace.sidebar_panel("bingo_ai11")
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
-import requests
-import re
+import numpy as np
+import pyarrow as pa
 import urllib3
-from bs4 import BeautifulSoup
+import perf_trace
+from bingo_core import history, backtest
+from bingo_prize import COST
 
 # 1. 系統設定
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -47,26 +49,7 @@ st.markdown("""
         margin: 2px;
     }
     .ball-verify { background: #2c3e50; color: #fff; }
-    .ball-hit { background: #e74c3c; color: white; }
-    .ball-miss { background: #ecf0f1; color: #bdc3c7; }
 
-    /* 損益表 */
-    .result-row-win {
-        background: #e8f5e9;
-        border-left: 5px solid #27ae60;
-        padding: 10px;
-        margin-bottom: 5px;
-        border-radius: 4px;
-    }
-    .result-row-loss {
-        background: #fff;
-        border-left: 5px solid #ccc;
-        padding: 10px;
-        margin-bottom: 5px;
-        border-radius: 4px;
-        color: #888;
-    }
-    
     /* 輸入框優化 */
     div[data-testid="stTextInput"] input {
         text-align: center;
@@ -77,64 +60,68 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 1. 抓取數據 (保留之前的穩定邏輯) ---
+HISTORY_DEPTH = 5000
+
 @st.cache_data(ttl=60)
-def fetch_data():
-    url = "https://www.pilio.idv.tw/bingo/list.asp"
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        res = requests.get(url, headers=headers, timeout=5, verify=False)
-        res.encoding = 'big5'
-        
-        soup = BeautifulSoup(res.text, 'html.parser')
-        rows = soup.find_all('tr')
-        
-        data = []
-        seen = set()
-        
-        for row in rows:
-            text = row.get_text(strip=True)
-            id_match = re.search(r'(11[3-9]\d{6})', text)
-            
-            if id_match:
-                draw_id = int(id_match.group(1))
-                if draw_id in seen: continue
-                
-                nums = re.findall(r'\d+', text)
-                clean = []
-                for n in nums:
-                    if int(n) == draw_id: continue
-                    if len(n) > 2: continue
-                    clean.append(int(n))
-                
-                if len(clean) >= 20:
-                    data.append({
-                        "期數": draw_id,
-                        "號碼": sorted(clean[:20])
-                    })
-                    seen.add(draw_id)
-        
-        # 回傳由新到舊 (驗證用) 和 由舊到新 (下拉選單用)
-        df = pd.DataFrame(data).sort_values(by="期數", ascending=False).reset_index(drop=True)
-        return df, "✅ 數據已同步"
-    except Exception as e:
-        return pd.DataFrame(), f"❌ 連線失敗: {e}"
+def fetch_data(depth=HISTORY_DEPTH):
+    draws, source, error = history.fetch_bingo(depth, timeout=5, app="bingo_ai12")
+    df = history.draws_frame(draws)
+    if source in ("live", "unchanged"): return df, "✅ 數據已同步" + (" (未更新)" if source == "unchanged" else "")
+    reason = error or "HTTP 錯誤"
+    if not df.empty: return df, f"💾 本地歷史 (連線失敗: {reason})"
+    return df, f"❌ 連線失敗: {reason}"
 
-# --- 2. 獎金表 ---
-def get_prize(star, hits):
-    table = {
-        1: {1: 50}, 2: {1: 25, 2: 75}, 3: {2: 50, 3: 500},
-        4: {2: 25, 3: 100, 4: 1000}, 5: {3: 50, 4: 500, 5: 7500},
-        6: {3: 25, 4: 200, 5: 1000, 6: 25000}, 7: {3: 25, 4: 50, 5: 300, 6: 3000, 7: 80000},
-        8: {4: 25, 5: 100, 6: 800, 7: 20000, 8: 500000}, 
-        9: {4: 25, 5: 100, 6: 1000, 7: 3000, 8: 100000, 9: 1000000},
-        10: {5: 25, 6: 100, 7: 1000, 8: 5000, 9: 25000, 10: 5000000}
-    }
-    return table.get(star, {}).get(hits, 0)
+# --- 2. 回測：逐期結果是一張 Arrow 欄位表，畫面一次只送一頁 ---
+PAGE_SIZE = 100
+CHART_POINTS = 500   # 累積損益圖最多畫幾個點
+
+@st.fragment
+def backtest_view(bt):
+    table, my_nums = bt['table'], bt['nums']
+    net = bt['net']
+
+    st.subheader("📊 損益報告")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("期數", table.num_rows)
+    c2.metric("成本", f"${bt['cost']}")
+    c3.metric("獎金", f"${bt['win']}")
+    c4.metric("淨利", f"${net}", delta_color="normal" if net==0 else "inverse")
+
+    # 摘要圖：累積淨利 (舊 -> 新，點數過多時等距抽樣) 與命中數分佈
+    g1, g2 = st.columns([2, 1])
+    step = max(1, table.num_rows // CHART_POINTS)
+    curve = table.select(["期數", "累積淨利"]).to_pandas().iloc[::-1].iloc[::step]
+    g1.line_chart(curve.set_index("期數"), height=220)
+    hit_dist = np.bincount(table.column("命中").to_numpy(), minlength=bt['star'] + 1)
+    g2.bar_chart(pd.DataFrame({"期數": hit_dist}, index=pd.Index(range(bt['star'] + 1), name="命中")), height=220)
+
+    # 星數比較：照格子順序取前 k 個號碼玩 k 星，同一段期數各賺賠多少
+    ladder = bt['ladder']
+    if len(ladder['star']) > 1:
+        with st.expander(f"🪜 同一組號碼玩 1 ~ {len(ladder['star'])} 星"):
+            cost = COST * bt['mult'] * table.num_rows
+            st.dataframe(pd.DataFrame({
+                "星數": ladder['star'],
+                "號碼": [" ".join(f"{n:02d}" for n in ladder['nums'][:k]) for k in ladder['star']],
+                "成本": cost,
+                "獎金": ladder['win'],
+                "淨利": ladder['net'],
+                "平均每期": np.round(ladder['net'] / table.num_rows, 1),
+            }), use_container_width=True, hide_index=True)
+
+    pages = max(1, -(-table.num_rows // PAGE_SIZE))
+    page = st.number_input(f"頁數 (共 {pages} 頁，每頁 {PAGE_SIZE} 期)", 1, pages, 1, key="ai12_backtest_page") if pages > 1 else 1
+    rows = table.slice((page - 1) * PAGE_SIZE, PAGE_SIZE)
+    labels = [" ".join(f"{n:02d}{'●' if m >> i & 1 else '○'}" for i, n in enumerate(my_nums)) for m in rows.column("命中遮罩").to_pylist()]
+    rows = rows.append_column("號碼 (●=開出)", pa.array(labels, pa.string()))
+    st.dataframe(rows, use_container_width=True, hide_index=True,
+                 column_order=["期數", "號碼 (●=開出)", "命中", "獎金", "淨利", "累積淨利"])
 
 # --- 3. 介面呈現 ---
 st.markdown("<div class='header'>🔢 賓果格子填空回測版</div>", unsafe_allow_html=True)
 
 df, status = fetch_data()
+render = perf_trace.start("bingo_ai12", "render")
 
 # A. 數據驗證區 (最重要)
 if not df.empty:
@@ -195,6 +182,11 @@ with st.sidebar:
     run_btn = st.button("🚀 計算損益", type="primary")
 
 # C. 計算邏輯
+# 結果跟著當時的輸入存；格子、倍數或期數一改就清掉，不會留著上一組號碼的報告
+inputs = (star, tuple(input_nums), mult, p_start, p_end)
+if st.session_state.get('ai12_backtest_inputs') != inputs:
+    st.session_state.pop('ai12_backtest', None)
+
 if run_btn:
     # 資料清洗與檢查
     clean_nums = [n for n in input_nums if n is not None]
@@ -212,56 +204,20 @@ if run_btn:
     elif p_start > p_end:
         st.error("❌ 起始期數不能大於結束期數。")
     else:
-        # 開始計算
+        # 開始計算 (結果存在 session，換頁不用重算)
         my_nums = sorted(clean_nums)
-        
         mask = (df['期數'] >= p_start) & (df['期數'] <= p_end)
-        # 這裡為了顯示習慣 (新->舊)，我們用原始 df (已經是 sort by desc)
-        # 但要注意 mask 篩選
-        target = df.loc[mask] 
-        
-        total_cost = len(target) * 25 * mult
-        total_win = 0
-        
-        history_html = ""
-        
-        for _, row in target.iterrows():
-            d_nums = set(row['號碼'])
-            m_set = set(my_nums)
-            hits = len(m_set.intersection(d_nums))
-            
-            prize = get_prize(star, hits) * mult
-            total_win += prize
-            
-            # 產生顯示
-            ball_html = ""
-            for n in my_nums:
-                style = "ball-hit" if n in d_nums else "ball-miss"
-                ball_html += f"<span class='ball {style}'>{n:02d}</span>"
-            
-            row_cls = "result-row-win" if prize > 0 else "result-row-loss"
-            prize_str = f"<b style='color:#d32f2f'>+${prize}</b>" if prize > 0 else "<span style='color:#aaa'>-25</span>"
-            
-            history_html += f"""
-            <div class='{row_cls}'>
-                <div style='display:flex; justify-content:space-between;'>
-                    <b>第 {row['期數']} 期</b>
-                    {prize_str}
-                </div>
-                <div style='margin-top:5px'>{ball_html}</div>
-            </div>
-            """
-            
-        net = total_win - total_cost
-        
-        st.subheader("📊 損益報告")
-        c1, c2, c3, c4 = st.columns(4)
-        c1.metric("期數", len(target))
-        c2.metric("成本", f"${total_cost}")
-        c3.metric("獎金", f"${total_win}")
-        c4.metric("淨利", f"${net}", delta_color="normal" if net==0 else "inverse")
-        
-        st.markdown(history_html, unsafe_allow_html=True)
+        with perf_trace.stage("bingo_ai12", "compute"):
+            target = df.loc[mask]
+            st.session_state.ai12_backtest = backtest.prize_table(target['期數'].to_numpy(), target['號碼'].tolist(), my_nums, star, mult, ranked=clean_nums)
+        st.session_state.ai12_backtest_inputs = inputs
+        st.session_state.pop("ai12_backtest_page", None)
+
+if st.session_state.get('ai12_backtest'):
+    backtest_view(st.session_state.ai12_backtest)
+elif not run_btn and not df.empty:
+    st.info(f"👈 請在左側填入 {star} 個號碼，系統會自動幫您對獎！")
 
-elif not df.empty:
-    st.info(f"👈 請在左側填入 {star} 個號碼，系統會自動幫您對獎！")
\ No newline at end of file
+# 效能診斷 (側欄)
+render.stop()
+perf_trace.sidebar_panel("bingo_ai12")
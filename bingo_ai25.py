@@ -1,11 +1,7 @@
 import streamlit as st
-import pandas as pd
-import requests
-import re
 import urllib3
-from bs4 import BeautifulSoup
-from collections import Counter
-import plotly.express as px
+import perf_trace
+from bingo_core import history, models, backtest, charts
 
 # 1. 系統設定
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -51,46 +47,58 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- 核心數據函數 ---
+HISTORY_DEPTH = 1000
+
 @st.cache_data(ttl=30)
-def fetch_data():
-    url = "https://www.pilio.idv.tw/bingo/list.asp"
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        res = requests.get(url, headers=headers, timeout=5, verify=False)
-        res.encoding = 'big5'
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        data = []
-        seen = set()
-        for row in soup.find_all('tr'):
-            text = row.get_text(strip=True)
-            id_match = re.search(r'(11[3-9]\d{6})', text)
-            if id_match:
-                draw_id = int(id_match.group(1))
-                if draw_id in seen: continue
-                nums = [int(n) for n in re.findall(r'\d+', text) if int(n) <= 80 and int(n) != draw_id]
-                if len(nums) >= 20:
-                    data.append({"期數": draw_id, "號碼": nums[:20]})
-                    seen.add(draw_id)
-        
-        return pd.DataFrame(data).sort_values("期數", ascending=False).reset_index(drop=True)
-    except: return pd.DataFrame()
+def fetch_data(depth=HISTORY_DEPTH):
+    return history.draws_frame(history.fetch_bingo(depth, timeout=5, app="bingo_ai25")[0])
+
+# --- 列表渲染：一頁只送一個 markdown 區塊，換頁只重跑該片段 ---
+PAGE_SIZE = 50
+
+def page_slice(total, key):
+    pages = max(1, -(-total // PAGE_SIZE))
+    page = st.number_input(f"頁數 (共 {pages} 頁，每頁 {PAGE_SIZE} 期)", 1, pages, 1, key=key) if pages > 1 else 1
+    start = (page - 1) * PAGE_SIZE
+    return slice(start, min(start + PAGE_SIZE, total))
 
-def get_stats(df, periods=20):
-    subset = df.head(periods)
-    all_nums = [n for sublist in subset['號碼'] for n in sublist]
-    counts = Counter(all_nums)
+def format_balls(nums, hit=None):
+    if hit is None: return "".join(f"<span class='ball ball-normal'>{n:02d}</span>" for n in nums)
+    return "".join(f"<span class='ball {'ball-hit' if h else 'ball-miss'}'>{n:02d}</span>" for n, h in zip(nums, hit))
+
+@st.fragment
+def history_view(df):
+    rows = df.iloc[page_slice(len(df), "history_page")]
+    body = "".join(
+        f"<div style='background:white; padding:10px; margin-bottom:8px; border-radius:8px; border-left:5px solid #3498db; box-shadow:0 1px 3px rgba(0,0,0,0.1);'>"
+        f"<div style='font-weight:bold; color:#2c3e50; margin-bottom:5px;'>第 {draw_id} 期</div><div>{format_balls(nums)}</div></div>"
+        for draw_id, nums in zip(rows['期數'], rows['號碼'])
+    )
+    st.markdown(f"<div style='height:500px; overflow-y:auto; padding-right:5px;'>{body}</div>", unsafe_allow_html=True)
+
+@st.fragment
+def backtest_view(bt):
+    k1, k2, k3 = st.columns(3)
+    k1.metric("平均命中", f"{bt['hits'].mean():.1f} 顆")
+    k2.metric("勝率 (過半)", f"{bt['win'].mean() * 100:.0f}%")
+    k3.metric("最高命中", f"{bt['hits'].max()} 顆")
     
-    hot = counts.most_common(10)
-    cold = []
-    for i in range(1, 81):
-        if i not in counts: cold.append((i, 0))
-        else: cold.append((i, counts[i]))
-    cold.sort(key=lambda x: x[1])
-    return hot, cold[:10]
+    st.divider()
+    st.markdown(f"#### 📜 詳細戰績 ({' '.join(f'{n:02d}' for n in bt['nums'])}，共 {len(bt['ids'])} 期)")
+    page = page_slice(len(bt['ids']), "ai25_backtest_page")
+    body = "".join(
+        f"<div class='history-row {'win' if win else 'loss'}'>"
+        f"<span style='width:90px; font-weight:bold; color:#555;'>{draw_id}</span>"
+        f"<span style='width:40px; font-size:1.2em;'>{'🎉' if win else '❌'}</span>"
+        f"<span style='flex-grow:1;'>{format_balls(bt['nums'], hit)}</span>"
+        f"<span style='font-weight:bold; color:#d35400;'>中 {hits}</span></div>"
+        for draw_id, hits, win, hit in zip(bt['ids'][page], bt['hits'][page].tolist(), bt['win'][page], bt['hit_matrix'][page])
+    )
+    st.markdown(f"<div class='history-container'>{body}</div>", unsafe_allow_html=True)
 
 # --- 主程式 ---
 df = fetch_data()
+render = perf_trace.start("bingo_ai25", "render")
 
 # 頂部資訊看板
 if not df.empty:
@@ -123,7 +131,8 @@ with col_left:
     star = st.slider("選擇星數 (1-10)", 1, 10, 3)
     
     st.markdown("### 🤖 AI 參謀")
-    hot_list, cold_list = get_stats(df, 50)
+    with perf_trace.stage("bingo_ai25", "compute"):
+        hot_list, cold_list = models.hot_cold(df['號碼'], 50)
     
     if "last_ai_mode" not in st.session_state: st.session_state.last_ai_mode = "手動輸入"
     
@@ -164,7 +173,7 @@ with col_left:
     if force_update: st.rerun()
 
     st.markdown("---")
-    backtest_range = st.select_slider("回測期數範圍", options=[10, 20, 50, 100], value=20)
+    backtest_range = st.select_slider("回測期數範圍", options=[10, 20, 50, 100, 200, 500, 1000], value=20)
     run_btn = st.button("🚀 執行戰術回測", type="primary", use_container_width=True)
 
 # === 右側：戰情室 ===
@@ -172,98 +181,44 @@ with col_right:
     tab1, tab2, tab3 = st.tabs(["📊 市場行情", "📜 歷史開獎", "📈 回測報告"])
     
     with tab1:
+        latest_id = df['期數'].iloc[0] if not df.empty else None
         c1, c2 = st.columns(2)
         with c1:
             st.markdown("#### 🔥 熱門號碼 (近50期)")
-            hot_df = pd.DataFrame(hot_list, columns=["號碼", "次數"])
-            fig_hot = px.bar(hot_df, x='號碼', y='次數', color='次數', color_continuous_scale='Reds')
+            fig_hot = charts.hot_cold_bars(latest_id, hot_list, "hot", 50)
             st.plotly_chart(fig_hot, use_container_width=True, height=250)
         with c2:
             st.markdown("#### ❄️ 冷門號碼 (近50期)")
-            cold_df = pd.DataFrame(cold_list, columns=["號碼", "次數"])
-            fig_cold = px.bar(cold_df, x='號碼', y='次數', color='次數', color_continuous_scale='Blues_r')
+            fig_cold = charts.hot_cold_bars(latest_id, cold_list, "cold", 50)
             st.plotly_chart(fig_cold, use_container_width=True, height=250)
 
     with tab2:
-        st.markdown(f"#### 📜 最近 100 期開獎紀錄")
-        history_display = df.head(100).copy()
-        
-        def format_balls(nums):
-            html = ""
-            for n in nums:
-                html += f"<span class='ball ball-normal'>{n:02d}</span>"
-            return html
-
-        # 分批渲染歷史開獎
-        st.markdown("<div style='height:500px; overflow-y:auto; padding-right:5px;'>", unsafe_allow_html=True)
-        for _, row in history_display.iterrows():
-            row_html = f"""
-            <div style='background:white; padding:10px; margin-bottom:8px; border-radius:8px; border-left:5px solid #3498db; box-shadow:0 1px 3px rgba(0,0,0,0.1);'>
-                <div style='font-weight:bold; color:#2c3e50; margin-bottom:5px;'>第 {row['期數']} 期</div>
-                <div>{format_balls(row['號碼'])}</div>
-            </div>
-            """
-            st.markdown(row_html, unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(f"#### 📜 歷史開獎紀錄 (共 {len(df)} 期)")
+        history_view(df)
 
     with tab3:
+        # 結果跟著當時的號碼、星數、範圍與最新期別存；任何一項改變就清掉，不會留著舊號碼的戰績
+        inputs = (star, tuple(sorted(user_nums)), backtest_range, current_period)
+        if st.session_state.get('ai25_backtest_inputs') != inputs:
+            st.session_state.pop('ai25_backtest', None)
         if run_btn:
             if len(user_nums) != star:
                 st.warning(f"⚠️ 請填滿 {star} 個號碼才能回測！")
             else:
-                target_df = df.head(backtest_range)
-                history = []
-                total_hits = 0
-                win_count = 0
-                
-                for _, row in target_df.iterrows():
-                    draw_nums = set(row['號碼'])
-                    hits = len(set(user_nums) & draw_nums)
-                    total_hits += hits
-                    
-                    is_win = hits >= (star/2 + 0.5)
-                    if is_win: win_count += 1
-                    
-                    res_html = ""
-                    for n in sorted(user_nums):
-                        cls = "ball-hit" if n in draw_nums else "ball-miss"
-                        res_html += f"<span class='ball {cls}'>{n:02d}</span>"
-                    
-                    history.append({
-                        "期數": row['期數'],
-                        "命中": hits,
-                        "球號": res_html,
-                        "狀態": "🎉" if is_win else "❌",
-                        "CSS": "win" if is_win else "loss"
-                    })
-                
-                k1, k2, k3 = st.columns(3)
-                k1.metric("平均命中", f"{total_hits / backtest_range:.1f} 顆")
-                k2.metric("勝率 (過半)", f"{win_count / backtest_range * 100:.0f}%")
-                k3.metric("最高命中", f"{max([h['命中'] for h in history])} 顆")
-                
-                st.divider()
-                st.markdown("#### 📜 詳細戰績")
-                
-                # --- 這裡進行了重要的修改：分批渲染 ---
-                st.markdown("<div class='history-container'>", unsafe_allow_html=True)
-                
-                for h in history:
-                    row_html = f"""
-                    <div class='history-row {h['CSS']}'>
-                        <span style='width:90px; font-weight:bold; color:#555;'>{h['期數']}</span>
-                        <span style='width:40px; font-size:1.2em;'>{h['狀態']}</span>
-                        <span style='flex-grow:1;'>{h['球號']}</span>
-                        <span style='font-weight:bold; color:#d35400;'>中 {h['命中']}</span>
-                    </div>
-                    """
-                    # 每次只渲染一行，確保正確解析
-                    st.markdown(row_html, unsafe_allow_html=True)
-                
-                st.markdown("</div>", unsafe_allow_html=True)
+                with perf_trace.stage("bingo_ai25", "compute"):
+                    target = df.head(backtest_range)
+                    st.session_state.ai25_backtest = backtest.hit_table(target['期數'].to_numpy(), target['號碼'].tolist(), user_nums)
+                st.session_state.ai25_backtest_inputs = inputs
+                st.session_state.pop("ai25_backtest_page", None)
+        if st.session_state.get('ai25_backtest'):
+            backtest_view(st.session_state.ai25_backtest)
         else:
             st.info("👈 請在左側設定號碼後，點擊「執行戰術回測」查看報告。")
 
 # 底部狀態列
 st.markdown("---")
-st.caption(f"資料來源：台灣彩券賓果賓果 | 自動更新頻率：每 5 分鐘 | 目前模式：{ai_mode} (v3.4 渲染修復版)")
\ No newline at end of file
+st.caption(f"資料來源：台灣彩券賓果賓果 | 自動更新頻率：每 5 分鐘 | 目前模式：{ai_mode} (v3.4 渲染修復版)")
+
+# 效能診斷 (側欄)
+render.stop()
+perf_trace.sidebar_panel("bingo_ai25")
@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
-import requests
-import re
 from collections import Counter
-import time
 import random
-import itertools
+import lotto_combos
+import perf_trace
+from bingo_core import lotto
+from bingo_core.tickets import combo_index, generate_tickets
 
 # --- 頁面設定 ---
 st.set_page_config(page_title="台灣彩券 AI 終極版 (含歷史)", page_icon="🏆", layout="wide")
@@ -29,137 +29,38 @@ with st.sidebar:
     st.markdown("---")
     st.success("📊 功能更新：\n\n✅ 已補回「歷史數據表」\n✅ AC值結構濾網\n✅ 40% 勝率模型")
 
-# --- 核心 1: 內建備份 (確保沒網路也能看歷史) ---
-def get_backup_data(type_name):
-    if "大樂透" in type_name:
-        return pd.DataFrame([
-            {"日期": "2026/02/06", "獎號": ["04","12","24","25","39","48"], "特別號": "09"},
-            {"日期": "2026/02/03", "獎號": ["06","14","32","33","39","43"], "特別號": "13"},
-            {"日期": "2026/01/30", "獎號": ["09","13","27","31","32","39"], "特別號": "19"},
-            {"日期": "2026/01/27", "獎號": ["04","11","24","25","29","30"], "特別號": "08"},
-            {"日期": "2026/01/23", "獎號": ["21","23","32","36","39","43"], "特別號": "12"},
-        ])
-    elif "威力彩" in type_name:
-        return pd.DataFrame([
-            {"日期": "2026/02/05", "獎號": ["07","22","28","34","36","37"], "特別號": "07"},
-            {"日期": "2026/02/02", "獎號": ["09","12","16","17","29","33"], "特別號": "03"},
-            {"日期": "2026/01/29", "獎號": ["03","07","19","24","29","33"], "特別號": "04"},
-            {"日期": "2026/01/26", "獎號": ["06","07","12","27","34","38"], "特別號": "05"},
-        ])
-    elif "539" in type_name:
-        return pd.DataFrame([
-            {"日期": "2026/02/07", "獎號": ["03","08","22","27","32"], "特別號": "無"},
-            {"日期": "2026/02/06", "獎號": ["01","06","29","32","34"], "特別號": "無"},
-            {"日期": "2026/02/05", "獎號": ["08","09","13","32","35"], "特別號": "無"},
-            {"日期": "2026/02/04", "獎號": ["08","17","22","27","28"], "特別號": "無"},
-        ])
-    return pd.DataFrame()
+# --- 核心 1: 彩種 -> pilio 路徑代碼 ---
+def game_code(type_name):
+    if "大樂透" in type_name: return "ltobig"
+    elif "威力彩" in type_name: return "lto"
+    elif "539" in type_name: return "lto539"
 
-# --- 核心 2: 爬蟲與數據 ---
+# --- 核心 2: 爬蟲與數據 (bingo_core.lotto：平行抓分頁、寫進 draw_store、以資料庫為準) ---
 @st.cache_data(ttl=600)
 def fetch_data(type_name):
-    pages = 8 # 抓多一點歷史
-    if "大樂透" in type_name: base_url = "https://www.pilio.idv.tw/ltobig/list.asp"; min_n = 7
-    elif "威力彩" in type_name: base_url = "https://www.pilio.idv.tw/lto/list.asp"; min_n = 7
-    elif "539" in type_name: base_url = "https://www.pilio.idv.tw/lto539/list.asp"; min_n = 5
-    
-    all_data = []
-    headers = {"User-Agent": "Mozilla/5.0"}
-    
-    for p in range(1, pages + 1):
-        try:
-            r = requests.get(f"{base_url}?indexpage={p}", headers=headers, timeout=8)
-            r.encoding = 'big5'
-            txt = re.sub(r'<[^>]+>', ' ', r.text)
-            pat_a = re.compile(r'(\d{2}/\d{2})\s+(\d{2})')
-            pat_b = re.compile(r'(\d{4}/\d{2}/\d{2})')
-            matches = []
-            for m in pat_a.finditer(txt): matches.append({"d": f"20{m.group(2)}/{m.group(1)}", "s": m.end()})
-            for m in pat_b.finditer(txt): matches.append({"d": m.group(1), "s": m.end()})
-            matches.sort(key=lambda x: x['s'])
-            
-            for i, m in enumerate(matches):
-                end = matches[i+1]['s'] if i < len(matches)-1 else len(txt)
-                nums = re.findall(r'\b\d{2}\b', txt[m['s']:end])
-                if len(nums) >= min_n:
-                    entry = {"日期": m['d'], "獎號": nums[:min_n-1] if "539" not in type_name else nums[:5], 
-                             "特別號": nums[min_n-1] if "539" not in type_name else "無"}
-                    all_data.append(entry)
-        except: continue
-    
-    if all_data: return pd.DataFrame(all_data)
-    return None
+    entries = lotto.fetch_lotto(game_code(type_name), app="bingo_ai3")
+    return pd.DataFrame(entries) if entries else None
 
 # --- 核心 3: 六大濾網 (The Winning Logic) ---
-def calculate_ac(numbers):
-    r = len(numbers)
-    diffs = set()
-    for pair in itertools.combinations(numbers, 2):
-        diffs.add(abs(pair[0] - pair[1]))
-    return len(diffs) - (r - 1)
+# 特徵與濾網本體在 lotto_combos：整個組合空間的特徵表只建一次 (python lotto_combos.py)，
+# 之後 memmap 載入，濾網就是對整欄做遮罩；這裡只是帶 spinner 觸發 bingo_core.tickets.combo_index 的快取
+@st.cache_resource(show_spinner="AI 正在載入組合特徵表 (首次建表需要數秒)...")
+def load_combo_index(game):
+    return combo_index(game)
 
-def is_prime(n):
-    if n < 2: return False
-    for i in range(2, int(n**0.5) + 1):
-        if n % i == 0: return False
-    return True
+# 選號模式 -> build_portfolio 的 cover (None 為濾網內均勻抽樣)
+PORTFOLIO_MODES = {"🎲 隨機 (濾網內均勻)": None, "🕸️ 最大二碼涵蓋": 2, "🔺 最大三碼涵蓋": 3, "↔️ 最小重疊": 0}
 
-def generate_winning_tickets(l_type, count=6): 
-    if "大樂透" in l_type: max_n, pick = 49, 6
-    elif "威力彩" in l_type: max_n, pick = 38, 6
-    elif "539" in l_type: max_n, pick = 39, 5
-    
-    tickets = []
-    attempts = 0
-    max_attempts = 150000 
-    
-    primes = [n for n in range(1, max_n+1) if is_prime(n)]
-    
-    progress_bar = st.progress(0, text="AI 正在進行萬次結構模擬...")
-    
-    while len(tickets) < count and attempts < max_attempts:
-        attempts += 1
-        if attempts % 2000 == 0:
-            progress_bar.progress(min(len(tickets)/count, 1.0), text=f"已篩選出 {len(tickets)} 組完美結構...")
-            
-        combo = sorted(random.sample(range(1, max_n+1), pick))
-        
-        # 濾網們
-        s = sum(combo)
-        if "大樂透" in l_type and not (115 <= s <= 185): continue
-        if "威力彩" in l_type and not (85 <= s <= 145): continue
-        if "539" in l_type and not (75 <= s <= 125): continue
-            
-        ac = calculate_ac(combo)
-        min_ac = 7 if pick == 6 else 4
-        if ac < min_ac: continue
-            
-        odds = sum(1 for n in combo if n%2!=0)
-        if pick == 6 and odds not in [3, 2, 4]: continue
-        if pick == 5 and odds not in [2, 3]: continue
-            
-        cons_groups = 0
-        for i in range(len(combo)-1):
-            if combo[i+1] - combo[i] == 1: cons_groups += 1
-        if cons_groups > 1: continue 
-        
-        prime_count = sum(1 for n in combo if n in primes)
-        if not (1 <= prime_count <= 3): continue
-            
-        zones = set(n // 10 for n in combo)
-        if len(zones) < 3: continue
-        
-        if combo not in [t['nums'] for t in tickets]:
-            tickets.append({"nums": combo, "ac": ac, "sum": s})
-            
-    progress_bar.empty()
-    return tickets
+def generate_winning_tickets(l_type, count=6, cover=None):
+    game = game_code(l_type)
+    load_combo_index(game)
+    return generate_tickets(game, count, cover)
 
 # --- 主程式 UI ---
 st.title(f"🏆 {lotto_type} - AI 終極結構預測")
 
 # 1. 取得資料 (合併備份與網路)
-df_backup = get_backup_data(lotto_type)
+df_backup = pd.DataFrame(lotto.backup_entries(game_code(lotto_type)))
 df_web = fetch_data(lotto_type)
 
 if df_web is not None and not df_web.empty:
@@ -167,6 +68,8 @@ if df_web is not None and not df_web.empty:
 else:
     df = df_backup.sort_values(by='日期', ascending=False).reset_index(drop=True)
 
+render = perf_trace.start("bingo_ai3", "render")
+
 # 2. 顯示最新一期
 if not df.empty:
     last_draw = df.iloc[0]
@@ -187,15 +90,23 @@ if not df.empty:
         
         with col1:
             st.subheader("🚀 生成幸運注單")
-            st.write("AI 將為您篩選出 **6 組** 符合 40% 勝率模型的完美號碼。")
+            mode_col, count_col = st.columns([2, 1])
+            mode = mode_col.selectbox("選號模式", list(PORTFOLIO_MODES))
+            ticket_count = count_col.number_input("注數", min_value=1, max_value=500, value=6)
+            st.write(f"AI 將為您篩選出 **{ticket_count} 組** 符合 40% 勝率模型的完美號碼。")
             
             if st.button("✨ 開始運算 (Generate)", type="primary"):
-                tickets = generate_winning_tickets(lotto_type, count=6)
+                with perf_trace.stage("bingo_ai3", "compute"):
+                    tickets, portfolio_stats = generate_winning_tickets(lotto_type, count=ticket_count, cover=PORTFOLIO_MODES[mode])
                 
                 # 用於匯出的資料
                 export_data = []
                 
                 st.markdown("### 💎 您的專屬幸運號碼：")
+                if portfolio_stats and portfolio_stats["cover"]:
+                    st.info(f"{len(tickets)} 注共涵蓋 {portfolio_stats['covered']:,} / {portfolio_stats['possible']:,} 組相異{'二' if portfolio_stats['cover'] == 2 else '三'}碼")
+                elif portfolio_stats:
+                    st.info(f"{len(tickets)} 注用到 {portfolio_stats['numbers']} 個號碼，任兩注最多重疊 {portfolio_stats['max_overlap']} 個")
                 
                 for i, t in enumerate(tickets):
                     nums_str = "  ".join([f"{n:02d}" for n in t['nums']])
@@ -236,6 +147,11 @@ if not df.empty:
             st.subheader("📊 統計概況")
             st.metric("分析期數", f"{len(df)} 期")
             
+            # 濾網通過率 (整個組合空間的精確統計)
+            _, _, combo_stats = load_combo_index(game_code(lotto_type))
+            st.metric("完美結構組合", f"{combo_stats['valid']:,}", f"通過率 {combo_stats['valid'] / combo_stats['total']:.1%}")
+            st.caption(" | ".join(f"{lotto_combos.FILTER_LABELS[name]} {cnt / combo_stats['total']:.0%}" for name, cnt in combo_stats['passed'].items()))
+            
             # 簡單的熱門號碼圖
             all_n = [int(x) for sublist in df['獎號'] for x in sublist]
             c = Counter(all_n)
@@ -261,4 +177,8 @@ if not df.empty:
                 "獎號": st.column_config.TextColumn("中獎號碼", width="large"),
                 "特別號": st.column_config.TextColumn("特", width="small"),
             }
-        )
\ No newline at end of file
+        )
+
+# 效能診斷 (側欄)
+render.stop()
+perf_trace.sidebar_panel("bingo_ai3")
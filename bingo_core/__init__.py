@@ -0,0 +1,22 @@
+import importlib
+
+# 無 Streamlit 的核心函式庫：抓取 / 解析、號碼模型、回測、選號都在這裡，頁面只負責畫面。
+# 子模組與函式一律延遲載入，import bingo_core 不會帶進 numpy / requests / pandas / pyarrow，
+# 批次工作與 CLI (python -m bingo_core) 用到哪個才載入哪個；charts 只在畫圖時才載入 plotly。
+SUBMODULES = ("history", "lotto", "models", "backtest", "tickets", "charts")
+EXPORTS = {
+    "fetch_bingo": "history", "fetch_with_fallback": "history", "mock_draws": "history", "draws_frame": "history",
+    "fetch_lotto": "lotto", "parse_lotto_page": "lotto", "backup_entries": "lotto",
+    "run_simulation": "models", "twin_scores": "models", "hot_cold": "models",
+    "prize_table": "backtest", "hit_table": "backtest",
+    "combo_index": "tickets", "generate_tickets": "tickets",
+}
+__all__ = list(SUBMODULES) + list(EXPORTS)
+
+def __getattr__(name):
+    if name in SUBMODULES: return importlib.import_module(f"{__name__}.{name}")
+    if name in EXPORTS: return getattr(importlib.import_module(f"{__name__}.{EXPORTS[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,79 @@
+import sys
+import argparse
+
+# 批次 / 命令列入口：python -m bingo_core <指令>；各指令用到的模組才在執行時載入
+#   python -m bingo_core sync                          # 抓最新一頁寫進 draw_store
+#   python -m bingo_core predict --model twin --depth 80
+#   python -m bingo_core backtest 3 17 25 --periods 1000
+#   python -m bingo_core tickets ltobig --count 6 --cover 2
+
+def cmd_sync(args):
+    from bingo_core import history
+    draws, source, error = history.fetch_bingo(args.depth)
+    print(f"{source}：資料庫最新 {draws[0]['id'] if draws else '無'}，讀出 {len(draws)} 期" + (f" ({error})" if error else ""))
+    return 0 if draws else 1
+
+def cmd_predict(args):
+    import draw_store
+    from bingo_core import models
+    data = draw_store.load("bingo", args.depth)
+    if not data:
+        print("資料庫沒有賓果歷史，請先執行 sync")
+        return 1
+    if args.model == "twin":
+        result = models.twin_scores(data)
+        top_3, probs = result["top_3"], result["probs"]
+        print(f"第 {int(data[0]['id']) + 1} 期 (數位雙生)：" + "  ".join(f"{n:02d} ({probs[n]}%)" for n in top_3))
+    else:
+        top_3, rates, _, _ = models.run_simulation(data, method=args.method)
+        print(f"第 {int(data[0]['id']) + 1} 期 ({args.method})：" + "  ".join(f"{n:02d} ({rates[n]:.2f}%)" for n in top_3))
+    return 0
+
+def cmd_backtest(args):
+    import draw_store
+    from bingo_core import backtest
+    data = draw_store.load("bingo", args.periods)
+    if not data:
+        print("資料庫沒有賓果歷史，請先執行 sync")
+        return 1
+    bt = backtest.prize_table([d['id'] for d in data], [d['nums'] for d in data], sorted(args.nums), args.star or len(args.nums), args.mult)
+    hits = bt["table"].column("命中").to_numpy()
+    print(f"{bt['table'].num_rows} 期 {data[-1]['id']} ~ {data[0]['id']}：成本 {bt['cost']}、獎金 {bt['win']}、淨利 {bt['net']}，"
+          f"平均命中 {hits.mean():.2f}")
+    return 0
+
+def cmd_tickets(args):
+    from bingo_core import tickets
+    result, stats = tickets.generate_tickets(args.game, args.count, args.cover)
+    for i, t in enumerate(result, 1):
+        print(f"{i:>3}: {' '.join(f'{n:02d}' for n in t['nums'])}  (AC {t['ac']}, 總和 {t['sum']})")
+    if stats: print(stats)
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bingo_core", description="賓果 / 樂透核心函式庫 (無 Streamlit)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("sync", help="抓最新一頁賓果寫進 draw_store")
+    p.add_argument("--depth", type=int, default=30)
+    p.set_defaults(run=cmd_sync)
+    p = sub.add_parser("predict", help="用資料庫歷史推算下一期前三名")
+    p.add_argument("--model", choices=("nebula", "twin"), default="nebula")
+    p.add_argument("--method", choices=("mc", "exact"), default="exact")
+    p.add_argument("--depth", type=int, default=30)
+    p.set_defaults(run=cmd_predict)
+    p = sub.add_parser("backtest", help="單注回測最近幾期")
+    p.add_argument("nums", type=int, nargs="+")
+    p.add_argument("--star", type=int, help="星數 (預設為號碼數)")
+    p.add_argument("--mult", type=int, default=1)
+    p.add_argument("--periods", type=int, default=100)
+    p.set_defaults(run=cmd_backtest)
+    p = sub.add_parser("tickets", help="樂透選號")
+    p.add_argument("game", choices=("ltobig", "lto", "lto539"))
+    p.add_argument("--count", type=int, default=6)
+    p.add_argument("--cover", type=int, choices=(0, 2, 3), help="省略為濾網內均勻抽樣")
+    p.set_defaults(run=cmd_tickets)
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
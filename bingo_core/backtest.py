@@ -0,0 +1,46 @@
+import numpy as np
+from bingo_features import to_masks, mask_of, hit_counts
+from bingo_prize import evaluate, star_ladder
+
+# --- 回測：ids / nums 為由新到舊的期別與號碼 (list of list 或 (N, 20) 陣列) ---
+
+# 每期每個號碼是否開出：(N, len(nums)) bool
+def _hit_matrix(draw_masks, nums):
+    idx = np.asarray(nums) - 1
+    return ((draw_masks[:, idx // 64] >> (idx % 64).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+# 單注 star 星 x mult 倍的逐期損益，結果是一張 Arrow 欄位表 (由新到舊)
+# 累積淨利照時間順序 (舊 -> 新) 累加後再翻回由新到舊；命中遮罩：第 i 個 bit 代表 my_nums[i] 有開出
+# ladder：同一組號碼取前 k 個 (照 ranked 的順序，預設 my_nums) 玩 k 星，每個星數一列總結
+def prize_table(ids, nums, my_nums, star, mult, ranked=None):
+    import pyarrow as pa
+    ids = np.asarray(ids, dtype=np.int64)[::-1]
+    draw_masks = to_masks(list(nums)[::-1])
+    hits = hit_counts(mask_of(my_nums), draw_masks)
+    result = evaluate(hits, star, mult)
+    bits = _hit_matrix(draw_masks, my_nums).astype(np.uint64)
+    hit_mask = (bits << np.arange(len(my_nums), dtype=np.uint64)).sum(axis=1)
+
+    newest_first = lambda a: np.ascontiguousarray(a[::-1])
+    table = pa.table({
+        "期數": pa.array(newest_first(ids), pa.int64()),
+        "命中": pa.array(newest_first(hits), pa.int8()),
+        "獎金": pa.array(newest_first(result['prize'][0]), pa.int64()),
+        "淨利": pa.array(newest_first(result['per_draw']), pa.int64()),
+        "累積淨利": pa.array(newest_first(result['cumulative']), pa.int64()),
+        "命中遮罩": pa.array(newest_first(hit_mask), pa.uint16()),
+    })
+    ranked = list(ranked or my_nums)
+    ladder = star_ladder(ranked, draw_masks, mult)
+    return {"nums": my_nums, "star": star, "mult": mult, "table": table,
+            "cost": result['cost'], "win": result['win'], "net": result['net'],
+            "ladder": {"star": np.arange(1, len(ladder['ticket_net']) + 1), "nums": ranked,
+                       "win": ladder['prize'].sum(axis=1), "net": ladder['ticket_net']}}
+
+# 命中數與每個號碼是否開出 (位元 AND + popcount)；過半命中算贏
+def hit_table(ids, nums, user_nums):
+    user_nums = sorted(user_nums)
+    draw_masks = to_masks(list(nums))
+    hits = hit_counts(mask_of(user_nums), draw_masks)
+    return {"nums": user_nums, "ids": np.asarray(ids, dtype=np.int64), "hits": hits, "hit_matrix": _hit_matrix(draw_masks, user_nums),
+            "win": hits >= (len(user_nums) / 2 + 0.5)}
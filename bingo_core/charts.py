@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+
+# --- Plotly 圖表：同一期 (draw_id) + 圖種 + 參數只建一次，跨 rerun / session 共用 ---
+# 存的是建好的 go.Figure：st.plotly_chart 收到 Figure 只做 to_dict + to_json (不驗證)，
+# 存 JSON 再還原反而要重跑一次 Figure 驗證，比重建還慢。Figure 建好後只讀不改，可安全共用。
+MAX_FIGURES = 64
+
+_figures = OrderedDict()
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+def cached(draw_id, kind, params, build):
+    key = (str(draw_id), kind, params)
+    with _lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+            stats["hits"] += 1
+            return fig
+    fig = build()
+    with _lock:
+        _figures[key] = fig
+        stats["misses"] += 1
+        while len(_figures) > MAX_FIGURES: _figures.popitem(last=False)
+    return fig
+
+def clear():
+    with _lock: _figures.clear()
+
+# 星雲神諭：前三名的四項屬性 (各自正規化到 0~1)
+RADAR_CATEGORIES = ['熱度 (Hot)', '連莊 (Repeat)', '重力 (Gravity)', '混沌 (Chaos)']
+RADAR_COLORS = ['#d946ef', '#8b5cf6', '#06b6d4']
+
+# 屬性只跟期別與期數有關 (混沌以期號為種子)，換推演引擎只會換前三名
+def radar(draw_id, top_3, attrs, depth=None):
+    def build():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        for i, n in enumerate(top_3):
+            vals = attrs[n]
+            max_val = max(vals) if max(vals) > 0 else 1
+            fig.add_trace(go.Scatterpolar(
+                r=[v/max_val for v in vals],
+                theta=RADAR_CATEGORIES,
+                fill='toself',
+                name=f'號碼 {n:02d}',
+                line_color=RADAR_COLORS[i],
+                opacity=0.6
+            ))
+        fig.update_layout(
+            polar=dict(radialaxis=dict(visible=True, range=[0, 1], showticklabels=False), bgcolor='#0f172a'),
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white'),
+            margin=dict(l=40, r=40, t=20, b=20),
+            height=300,
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5)
+        )
+        return fig
+    return cached(draw_id, "radar", (depth, tuple(top_3)), build)
+
+# 數位雙生：80 個號碼的 熱度 x 遺漏 x 能量 (df_feat 見 models.twin_scores)
+def energy_3d(draw_id, df_feat, depth=None):
+    top = tuple(int(n) for n in df_feat.loc[df_feat['is_top'], 'num'])
+    def build():
+        import plotly.graph_objects as go
+        fig = go.Figure(data=[go.Scatter3d(
+            x=df_feat['freq'], y=df_feat['gap'], z=df_feat['score'],
+            mode='markers+text',
+            marker=dict(
+                size=[15 if x else 5 for x in df_feat['is_top']],
+                color=['#ff0000' if x else '#00f2ff' for x in df_feat['is_top']],
+                opacity=0.8
+            ),
+            text=[str(n) if t else "" for n, t in zip(df_feat['num'], df_feat['is_top'])],
+            textfont=dict(color='white', size=15)
+        )])
+        fig.update_layout(scene = dict(xaxis_title='熱度', yaxis_title='遺漏', zaxis_title='能量', xaxis=dict(backgroundcolor="black"), yaxis=dict(backgroundcolor="black"), zaxis=dict(backgroundcolor="black")), paper_bgcolor='black', height=400, margin=dict(l=0,r=0,b=0,t=0))
+        return fig
+    return cached(draw_id, "energy_3d", (depth, top), build)
+
+# 兩個方案中 2 / 3 碼的單期獎金比較；只跟獎金表有關，不分期別
+def roi_bars(labels, pay_a, pay_b):
+    def build():
+        import plotly.graph_objects as go
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=pay_a,
+            name='方案 A (4倍三星)',
+            marker_color='#00f2ff',
+            text=[f'${v:,}' for v in pay_a],
+            textposition='auto'
+        ))
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=pay_b,
+            name='方案 B (混買)',
+            marker_color='#555',
+            text=[f'${v:,}' for v in pay_b],
+            textposition='auto'
+        ))
+        fig.update_layout(
+            title="單期獲利能力比較 (同樣成本 $100)",
+            plot_bgcolor='#111',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color='white'),
+            yaxis_title="獎金 (元)",
+            barmode='group'
+        )
+        return fig
+    return cached(None, "roi", (tuple(labels), tuple(pay_a), tuple(pay_b)), build)
+
+# 冷熱號長條圖 (hot / cold 見 models.hot_cold)
+def hot_cold_bars(draw_id, pairs, kind, periods):
+    def build():
+        import pandas as pd
+        import plotly.express as px
+        df = pd.DataFrame(pairs, columns=['號碼', '次數'])
+        scale = 'Reds' if kind == "hot" else 'Blues_r'
+        return px.bar(df, x='號碼', y='次數', color='次數', color_continuous_scale=scale)
+    return cached(draw_id, f"{kind}_bars", (periods, tuple(pairs)), build)
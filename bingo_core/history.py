@@ -0,0 +1,48 @@
+import random
+import draw_store
+import bingo_parser
+import pilio_client
+import perf_trace
+
+# --- 賓果開獎歷史：抓第 1 頁、新期別寫進 draw_store，歷史一律以資料庫為準 ---
+# 回傳 (由新到舊的 draws, 來源, 錯誤)；來源："live" 有新頁面、"unchanged" 上游回 304、
+# "failed" 上游回其他狀態碼、"offline" 連線失敗。後兩者 draws 仍是資料庫裡既有的歷史。
+def fetch_bingo(depth, timeout=10, app="bingo_core"):
+    source, error = "offline", None
+    try:
+        res = pilio_client.get(pilio_client.url("/bingo/list.asp"), timeout=timeout)
+        perf_trace.response(app, res)
+        if res.status_code == 200:
+            with perf_trace.stage(app, "parse"):
+                ids, nums = bingo_parser.parse(res.content)
+                draws = bingo_parser.to_draws(ids, nums)
+            draw_store.insert_new("bingo", draws)
+            if draws: pilio_client.commit(res)
+            source = "live"
+        else:
+            source = "unchanged" if pilio_client.not_modified(res) else "failed"
+    except Exception as e:
+        error = e
+    try: return draw_store.load("bingo", depth), source, error
+    except Exception as e: return [], "offline", error or e
+
+# 資料不足時的模擬開獎 (由新到舊)
+def mock_draws(count=80, base_id=115008000):
+    return [{"id": str(base_id - i), "nums": sorted(random.sample(range(1, 81), 20))} for i in range(count)]
+
+MIN_HISTORY = 10
+FALLBACK_REASON = {"failed": "連線失敗", "offline": "網路異常"}
+
+# 抓取失敗先用本地歷史，資料庫也不足 MIN_HISTORY 期才退回模擬資料；回傳 (draws, 狀態文字)
+def fetch_with_fallback(depth, timeout=5, app="bingo_core"):
+    draws, source, _ = fetch_bingo(depth, timeout, app)
+    if source in FALLBACK_REASON:
+        if len(draws) >= MIN_HISTORY: return draws, f"💾 本地歷史 ({FALLBACK_REASON[source]})"
+        return mock_draws(depth), f"⚠️ 離線模擬 ({FALLBACK_REASON[source]})"
+    if len(draws) < MIN_HISTORY: return mock_draws(depth), "⚠️ 離線模擬 (資料不足)"
+    return draws, "✅ 連線正常 (未更新)" if source == "unchanged" else "✅ 連線正常 (Live Data)"
+
+# 回測頁面用的表格：期數 (int) / 號碼 (list)，由新到舊
+def draws_frame(draws):
+    import pandas as pd
+    return pd.DataFrame({"期數": [int(d['id']) for d in draws], "號碼": [d['nums'] for d in draws]})
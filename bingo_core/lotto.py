@@ -0,0 +1,109 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import draw_store
+import pilio_client
+import perf_trace
+
+# --- 樂透 (大樂透 / 威力彩 / 今彩539) 開獎歷史 ---
+# 條目格式沿用頁面：{"日期": "YYYY/MM/DD", "獎號": ["04", ...], "特別號": "09" 或 "無"}
+PAGES = 8               # 抓多一點歷史
+FETCH_DEADLINE = 12     # 所有分頁共用的總時限 (秒)
+MIN_NUMS = {"ltobig": 7, "lto": 7, "lto539": 5}
+
+# 內建備份 (確保沒網路也能看歷史)
+BACKUP = {
+    "ltobig": [
+        {"日期": "2026/02/06", "獎號": ["04","12","24","25","39","48"], "特別號": "09"},
+        {"日期": "2026/02/03", "獎號": ["06","14","32","33","39","43"], "特別號": "13"},
+        {"日期": "2026/01/30", "獎號": ["09","13","27","31","32","39"], "特別號": "19"},
+        {"日期": "2026/01/27", "獎號": ["04","11","24","25","29","30"], "特別號": "08"},
+        {"日期": "2026/01/23", "獎號": ["21","23","32","36","39","43"], "特別號": "12"},
+    ],
+    "lto": [
+        {"日期": "2026/02/05", "獎號": ["07","22","28","34","36","37"], "特別號": "07"},
+        {"日期": "2026/02/02", "獎號": ["09","12","16","17","29","33"], "特別號": "03"},
+        {"日期": "2026/01/29", "獎號": ["03","07","19","24","29","33"], "特別號": "04"},
+        {"日期": "2026/01/26", "獎號": ["06","07","12","27","34","38"], "特別號": "05"},
+    ],
+    "lto539": [
+        {"日期": "2026/02/07", "獎號": ["03","08","22","27","32"], "特別號": "無"},
+        {"日期": "2026/02/06", "獎號": ["01","06","29","32","34"], "特別號": "無"},
+        {"日期": "2026/02/05", "獎號": ["08","09","13","32","35"], "特別號": "無"},
+        {"日期": "2026/02/04", "獎號": ["08","17","22","27","28"], "特別號": "無"},
+    ],
+}
+
+def backup_entries(game):
+    return list(BACKUP.get(game, []))
+
+def stored_entries(game):
+    return [{"日期": d['id'], "獎號": [f"{n:02d}" for n in d['nums']], "特別號": d['special']} for d in draw_store.load(game)]
+
+TAG_RE = re.compile(r'<[^>]+>')
+DATE_A_RE = re.compile(r'(\d{2}/\d{2})\s+(\d{2})')
+DATE_B_RE = re.compile(r'(\d{4}/\d{2}/\d{2})')
+NUM_RE = re.compile(r'\b\d{2}\b')
+
+# 頁面文字 -> 條目；日期後面到下一個日期之間的兩位數依序為獎號 (+ 特別號)
+def parse_lotto_page(text, game):
+    min_n = MIN_NUMS[game]
+    txt = TAG_RE.sub(' ', text)
+    matches = []
+    for m in DATE_A_RE.finditer(txt): matches.append({"d": f"20{m.group(2)}/{m.group(1)}", "s": m.end()})
+    for m in DATE_B_RE.finditer(txt): matches.append({"d": m.group(1), "s": m.end()})
+    matches.sort(key=lambda x: x['s'])
+
+    entries = []
+    for i, m in enumerate(matches):
+        end = matches[i+1]['s'] if i < len(matches)-1 else len(txt)
+        nums = NUM_RE.findall(txt[m['s']:end])
+        if len(nums) >= min_n:
+            if game == "lto539": entries.append({"日期": m['d'], "獎號": nums[:5], "特別號": "無"})
+            else: entries.append({"日期": m['d'], "獎號": nums[:min_n-1], "特別號": nums[min_n-1]})
+    return entries
+
+# 單頁，回傳 (條目, 回應)；304 (此頁的期別已在資料庫) 條目為 None
+def fetch_page(url, game, app="bingo_core"):
+    r = pilio_client.get(url, timeout=8, verify=True)
+    perf_trace.response(app, r)
+    if pilio_client.not_modified(r): return None, r
+    with perf_trace.stage(app, "parse"):
+        return parse_lotto_page(r.text, game), r
+
+# 冷啟動：所有頁同時抓；已有歷史：先抓第 1 頁，有新日期才平行抓其餘頁面
+# 新期別寫入本地資料庫，歷史以資料庫為準 (重啟不遺失、可累積超過 PAGES 頁)；都沒有時回傳空串列
+def fetch_lotto(game, pages=PAGES, deadline=FETCH_DEADLINE, app="bingo_core"):
+    base_url = pilio_client.url(f"/{game}/list.asp")
+    urls = [f"{base_url}?indexpage={p}" for p in range(1, pages + 1)]
+
+    try: known = draw_store.known_ids(game)
+    except Exception: known = set()
+
+    all_data, responses = [], []
+    deadline = time.monotonic() + deadline
+    pool = ThreadPoolExecutor(max_workers=pages)
+    futures = [pool.submit(fetch_page, u, game, app) for u in (urls[:1] if known else urls)]
+    try:
+        for p in range(pages):
+            if p == len(futures):
+                futures += [pool.submit(fetch_page, u, game, app) for u in urls[p:]]
+            try: entries, res = futures[p].result(timeout=max(0, deadline - time.monotonic()))
+            except TimeoutError: break
+            except Exception: continue
+            # 依頁序合併；整頁都是已知日期 (或 304) 就不必再往後看
+            if entries is None: break
+            all_data.extend(entries)
+            if entries: responses.append(res)
+            if entries and all(e["日期"] in known for e in entries): break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    try:
+        draw_store.insert_new(game, [{"id": d["日期"], "nums": d["獎號"], "special": d["特別號"]} for d in all_data])
+        # 寫進資料庫之後才記下驗證標頭 (見 pilio_client.commit)
+        for res in responses: pilio_client.commit(res)
+        stored = stored_entries(game)
+        if stored: return stored
+    except Exception: pass
+    return all_data
@@ -0,0 +1,122 @@
+from collections import Counter
+import numpy as np
+from bingo_sim import sample_counts, inclusion_probs
+from bingo_features import CoOccurrence, GapIndex
+
+# --- 號碼模型：輸入一律是由新到舊的 [{"id", "nums"}] ---
+
+# --- 星雲神諭：蒙地卡羅 (抽樣 SIM_TRIALS 次) 或解析解 (直接算出每個號碼的開出機率) ---
+# 單核實測：1e6 次約 0.6 秒，跟舊版逐次 np.random.choice 跑 1e4 次 (0.55~0.75 秒) 差不多；
+# 20 萬次約 0.12 秒，開出率的標準誤已在 0.1% 以下，所以預設用 20 萬次
+SIM_TRIALS = 200000
+
+# 回傳 (前三名, 前三名開出率 %, 各號碼模擬開出次數 {號碼: 次數}, 雷達圖屬性)
+# 解析解沒有抽樣，次數是 trials 期的期望值 (浮點數)
+def run_simulation(data, trials=SIM_TRIALS, method="mc"):
+    if not data: return None, None, None, None
+
+    # 以最新期號為種子，同一期重整結果不會跳動
+    try: seed = int(data[0]['id'])
+    except: seed = None
+    rng = np.random.default_rng(seed)
+
+    probs = np.ones(81) * 1.0
+    all_nums = [n for d in data for n in d['nums']]
+    counts = Counter(all_nums)
+    last_draw = data[0]['nums']
+
+    # 屬性分數 (用於雷達圖)
+    # 格式: {num: {'hot': v, 'repeat': v, 'gravity': v, 'chaos': v}}
+    attr_scores = {}
+
+    for n in range(1, 81):
+        # 1. 熱度 (Frequency)
+        hot_score = counts[n] * 2.5
+        probs[n] += hot_score
+
+        # 2. 連莊 (Momentum)
+        rep_score = 20.0 if n in last_draw else 0
+        probs[n] += rep_score
+
+        # 3. 重力 (Gravity)
+        grav_score = (counts.get(n-1, 0) + counts.get(n+1, 0)) * 0.5
+        probs[n] += grav_score
+
+        # 4. 混沌 (Chaos)
+        chaos_score = rng.uniform(0, 5)
+        probs[n] += chaos_score
+
+        # 記錄屬性 (正規化後用於繪圖)
+        attr_scores[n] = [hot_score, rep_score, grav_score, chaos_score]
+
+    weights = probs[1:]
+    weight_sum = np.sum(weights)
+    weights = weights / weight_sum if weight_sum > 0 else np.ones(80)/80
+
+    if method == "exact":
+        probs = inclusion_probs(weights)
+        raw = {n: float(probs[n-1]) * trials for n in range(1, 81)}
+    else:
+        # 批次模擬 (一列一次開獎)
+        hits = sample_counts(weights, trials, rng=rng)
+        probs = hits / trials
+        raw = {n: int(hits[n-1]) for n in range(1, 81) if hits[n-1]}
+
+    top_3 = [int(i) + 1 for i in np.argsort(-probs, kind='stable')[:3]]
+    rates = {n: float(probs[n-1]) * 100 for n in top_3}
+
+    return top_3, rates, raw, attr_scores
+
+
+# --- 數位雙生 (bingo_ai10 / bingo_ai11 共用)：熱度 + 鄰號與共現重力 + 遺漏回補 + 擾動 ---
+# co / gap_index 傳入上次的索引時只補上新進的期別；回傳 {"top_3", "df_feat" (3D 圖用), "probs"}
+# 熱度取自共現索引的視窗次數表 (視窗 = 歷史期數，呼叫端自帶索引時 window 要跟 len(data) 一致)，80 個號碼一次算完
+def twin_scores(data, co=None, gap_index=None):
+    import pandas as pd
+    try: latest_id = int(data[0]['id'])
+    except: latest_id = 12345
+    np.random.seed(latest_id)
+
+    # 共現矩陣與次數表 (增量維護，只補上新進的期別)
+    co = (co or CoOccurrence(window=len(data))).sync(data)
+    counts = co.counts[1:81].astype(np.int64)
+    last_draw = data[0]['nums']
+    co_gravity = co.gravity(last_draw)[1:81] * 0.2
+    # 目前遺漏期數 (最後出現位置索引，上限為資料期數)
+    gaps = (gap_index or GapIndex()).sync(data).current(cap=len(data))[1:81]
+
+    # 鄰號重力：n-1 或 n+1 在上一期各加 10 分
+    in_last = np.zeros(82, dtype=bool)
+    in_last[np.asarray(last_draw, dtype=np.intp)] = True
+    gravity = (in_last[:80].astype(np.float64) + in_last[2:]) * 10 + co_gravity
+    avg_gap = 80 / np.maximum(counts, 1)
+    scores = counts * 3.0 + gravity + np.where(gaps > avg_gap, 15, 0) + np.random.uniform(0, 5, 80)
+
+    top_idx = np.argsort(-scores, kind='stable')[:3]
+    top_3 = [int(i) + 1 for i in top_idx]
+    is_top = np.zeros(80, dtype=bool)
+    is_top[top_idx] = True
+
+    df_feat = pd.DataFrame({
+        "num": np.arange(1, 81),
+        "freq": counts,
+        "gap": gaps.astype(np.int64),
+        "score": scores,
+        "is_top": is_top
+    })
+    probs = {n: int(min(99, (scores[n-1]/scores[top_3[0]-1])*95)) for n in top_3}
+
+    return {
+        "top_3": top_3,
+        "df_feat": df_feat,
+        "probs": probs
+    }
+
+
+# --- 冷熱號：最近 periods 期的前 10 熱門與前 10 冷門 (次數, 沒開過算 0) ---
+# nums_list 為由新到舊的號碼串列
+def hot_cold(nums_list, periods=20):
+    counts = Counter(n for nums in list(nums_list)[:periods] for n in nums)
+    hot = counts.most_common(10)
+    cold = sorted(((i, counts.get(i, 0)) for i in range(1, 81)), key=lambda x: x[1])
+    return hot, cold[:10]
@@ -0,0 +1,19 @@
+from functools import lru_cache
+import lotto_combos
+
+# --- 樂透選號：特徵表與濾網本體在 lotto_combos，整個組合空間的特徵表只建一次，之後 memmap 載入 ---
+
+# (特徵表, 通過濾網的組合 rank, 濾網統計)
+@lru_cache(maxsize=None)
+def combo_index(game):
+    tables = lotto_combos.load_tables(game)
+    return (tables, *lotto_combos.query(tables, lotto_combos.GAMES[game]["rules"]))
+
+# cover：None 為濾網內均勻抽樣，2 / 3 為最大二 / 三碼涵蓋，0 為最小重疊 (見 lotto_combos.build_portfolio)
+# 回傳 ([{"nums", "ac", "sum"}], 組合統計 (均勻抽樣時為 None))
+def generate_tickets(game, count=6, cover=None, rng=None):
+    tables, valid, _ = combo_index(game)
+    if cover is None: ranks, stats = lotto_combos.sample_tickets(valid, count, rng), None
+    else: ranks, stats = lotto_combos.build_portfolio(valid, count, game, cover, rng=rng)
+    combos = lotto_combos.unrank(ranks, game).tolist()
+    return [{"nums": combo, "ac": int(tables["ac"][r]), "sum": int(tables["sum"][r])} for combo, r in zip(combos, ranks)], stats
@@ -0,0 +1,194 @@
+from collections import deque
+import numpy as np
+
+# --- 增量索引的共用同步邏輯 ---
+# data 為由新到舊的 [{"id", "nums"}]；只補上比 latest_id 新的期別 (window 有設定時只看最近 window 期)
+# 資料來源換了 (期別倒退，或同一期號碼不同，例如模擬資料) 就整個重建；
+# 已收錄的舊期別跟 data 對不上 (回補後歷史變深、中間補洞、或資料變短) 也重建，舊的期別才會算進去
+# 一次補進 BULK 期以上 (冷啟動、長歷史) 時走子類別的 extend 整批向量化，平常每期只進一兩筆就逐期 push
+BULK = 64
+
+class DrawIndex:
+    window = None
+
+    def __init__(self):
+        self.latest_id = None
+        self.latest_nums = None
+        self.oldest_id = None
+        self.count = 0          # 收錄過的期數
+
+    def push(self, draw_id, nums):
+        self.latest_id = int(draw_id)
+        self.latest_nums = sorted(nums)
+
+    def reset(self):
+        self.latest_id = None
+        self.latest_nums = None
+        self.oldest_id = None
+        self.count = 0
+
+    # draws 由舊到新
+    def extend(self, draws):
+        for d in draws: self.push(d['id'], d['nums'])
+
+    # head 裡不是新進的期別 (old) 應該剛好是已收錄的那些：
+    # 有視窗時補完 fresh 後視窗內應有 min(count + fresh, window) 期；沒有視窗時不能比收錄的多，也不能早於最舊一期
+    def _stale(self, head, fresh):
+        old = len(head) - len(fresh)
+        if self.window is not None: return old != min(self.count + len(fresh), self.window) - len(fresh)
+        return int(head[-1]['id']) < self.oldest_id or old > self.count
+
+    def sync(self, data):
+        if not data: return self
+        if self.latest_id is not None:
+            newest = int(data[0]['id'])
+            if newest < self.latest_id or (newest == self.latest_id and sorted(data[0]['nums']) != self.latest_nums): self.reset()
+        head = data if self.window is None else data[:self.window]
+        fresh = [d for d in head if self.latest_id is None or int(d['id']) > self.latest_id]
+        if self.latest_id is not None and self._stale(head, fresh):
+            self.reset()
+            fresh = head
+        if len(fresh) >= BULK: self.extend(fresh[::-1])
+        else: DrawIndex.extend(self, fresh[::-1])
+        if fresh:
+            if self.oldest_id is None: self.oldest_id = int(fresh[-1]['id'])
+            self.count += len(fresh)
+        return self
+
+
+# --- 共現矩陣 (滑動視窗，逐期增量更新) ---
+# matrix[a][b] = 視窗內 a、b 同期開出的次數 (對角線為 0)，counts[n] = 視窗內 n 開出次數。
+# 新的一期進來只加上它的 20x20 組合，超出視窗的最舊一期再扣回去。
+class CoOccurrence(DrawIndex):
+    def __init__(self, window=80, max_num=80):
+        super().__init__()
+        self.window = window
+        self.matrix = np.zeros((max_num + 1, max_num + 1), dtype=np.int32)
+        self.counts = np.zeros(max_num + 1, dtype=np.int32)
+        self.draws = deque()
+
+    def _apply(self, idx, sign):
+        self.matrix[np.ix_(idx, idx)] += sign
+        self.matrix[idx, idx] -= sign
+        self.counts[idx] += sign
+
+    def push(self, draw_id, nums):
+        super().push(draw_id, nums)
+        idx = np.asarray(nums, dtype=np.intp)
+        self._apply(idx, 1)
+        self.draws.append(idx)
+        while len(self.draws) > self.window:
+            self._apply(self.draws.popleft(), -1)
+
+    def reset(self):
+        super().reset()
+        self.matrix[:] = 0
+        self.counts[:] = 0
+        self.draws.clear()
+
+    # 整批：只有最後 window 期會留在視窗裡，直接以 one-hot 的 M^T M 重算 (分批避免 N x 81 的大暫存)
+    def extend(self, draws):
+        if len(draws) < self.window: return DrawIndex.extend(self, draws)
+        self.reset()
+        nums = np.asarray([d['nums'] for d in draws[-self.window:]], dtype=np.intp)
+        for i in range(0, len(nums), 100000):
+            onehot = np.zeros((len(nums[i:i + 100000]), len(self.counts)), dtype=np.float32)
+            onehot[np.arange(len(onehot))[:, None], nums[i:i + 100000]] = 1
+            self.matrix += (onehot.T @ onehot).astype(np.int32)
+            self.counts += onehot.sum(axis=0).astype(np.int32)
+        np.fill_diagonal(self.matrix, 0)
+        self.draws.extend(nums)
+        DrawIndex.push(self, draws[-1]['id'], draws[-1]['nums'])
+
+    # 重力項：上一期每個號碼對 n 的共現次數總和 (一次向量化列加總)
+    def gravity(self, last_draw):
+        return self.matrix[np.asarray(last_draw, dtype=np.intp)].sum(axis=0)
+
+
+# --- 遺漏 (gap) 索引：每個號碼最後出現的位置，每進一期只更新那 20 個號碼 ---
+# 同時累積每個號碼的遺漏長度直方圖、平均與最大遺漏，歷史再長查詢都是 O(80)。
+class GapIndex(DrawIndex):
+    def __init__(self, max_num=80, max_gap=200):
+        super().__init__()
+        self.max_gap = max_gap
+        self.seq = 0                                              # 已收錄期數
+        self.last_seen = np.full(max_num + 1, -1, dtype=np.int64)
+        self.hist = np.zeros((max_num + 1, max_gap + 1), dtype=np.int32)  # 最後一格為 >= max_gap
+        self.gap_sum = np.zeros(max_num + 1, dtype=np.int64)
+        self.gap_count = np.zeros(max_num + 1, dtype=np.int64)
+        self.gap_max = np.zeros(max_num + 1, dtype=np.int64)
+
+    def push(self, draw_id, nums):
+        super().push(draw_id, nums)
+        idx = np.asarray(nums, dtype=np.intp)
+        prev = self.last_seen[idx]
+        seen = idx[prev >= 0]
+        gaps = self.seq - prev[prev >= 0] - 1
+        self.hist[seen, np.minimum(gaps, self.max_gap)] += 1
+        self.gap_sum[seen] += gaps
+        self.gap_count[seen] += 1
+        self.gap_max[seen] = np.maximum(self.gap_max[seen], gaps)
+        self.last_seen[idx] = self.seq
+        self.seq += 1
+
+    def reset(self):
+        super().reset()
+        self.seq = 0
+        self.last_seen[:] = -1
+        for arr in (self.hist, self.gap_sum, self.gap_count, self.gap_max): arr[:] = 0
+
+    # 整批：先建 (號碼 x 期) 的出現表，每個號碼的出現位置相鄰相減就是遺漏；第一筆接上原本的 last_seen
+    def extend(self, draws):
+        nums = np.asarray([d['nums'] for d in draws], dtype=np.intp)
+        present = np.zeros((len(self.last_seen), len(nums)), dtype=bool)
+        present[nums, np.arange(len(nums))[:, None]] = True
+        for k in np.flatnonzero(present.any(axis=1)):
+            pos = np.flatnonzero(present[k]) + self.seq
+            gaps = np.diff(pos if self.last_seen[k] < 0 else np.r_[self.last_seen[k], pos]) - 1
+            if len(gaps):
+                self.hist[k] += np.bincount(np.minimum(gaps, self.max_gap), minlength=self.max_gap + 1).astype(np.int32)
+                self.gap_sum[k] += gaps.sum()
+                self.gap_count[k] += len(gaps)
+                self.gap_max[k] = max(self.gap_max[k], gaps.max())
+            self.last_seen[k] = pos[-1]
+        self.seq += len(nums)
+        DrawIndex.push(self, draws[-1]['id'], draws[-1]['nums'])
+
+    # 目前遺漏期數 (最新一期有開 = 0)；從沒開過的號碼算整段歷史長度，cap 可限制上限
+    def current(self, cap=None):
+        gaps = np.where(self.last_seen >= 0, self.seq - 1 - self.last_seen, self.seq)
+        return gaps if cap is None else np.minimum(gaps, cap)
+
+    def mean(self):
+        return np.divide(self.gap_sum, self.gap_count, out=np.zeros(len(self.gap_sum)), where=self.gap_count > 0)
+
+
+# --- 位元集合：每期 / 每注以 80 bit (兩個 uint64) 表示，號碼 n 對應第 n-1 個 bit ---
+WORDS = 2
+
+if hasattr(np, 'bitwise_count'):
+    popcount = np.bitwise_count
+else:
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    def popcount(x):
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _POP8[x.view(np.uint8)].reshape(*x.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+# nums: (N, k) 號碼陣列 (或 list of list) -> (N, 2) uint64
+# 先填 (N, 128) 的 one-hot，再用 packbits 壓成 16 bytes 一列
+def to_masks(nums):
+    nums = np.asarray(nums, dtype=np.intp)
+    if nums.size == 0: return np.zeros((len(nums), WORDS), dtype=np.uint64)
+    onehot = np.zeros((len(nums), 64 * WORDS), dtype=bool)
+    onehot[np.arange(len(nums))[:, None], nums - 1] = True
+    return np.packbits(onehot, axis=1, bitorder='little').view(np.uint64)
+
+def mask_of(nums):
+    return to_masks([list(nums)])[0]
+
+# 命中數：tickets (T, 2) 或單注 (2,) 對 draws (N, 2)，回傳 (T, N) 或 (N,) 的 int
+def hit_counts(tickets, draws):
+    tickets = np.asarray(tickets, dtype=np.uint64)
+    if tickets.ndim == 1:
+        return popcount(draws & tickets).sum(axis=-1, dtype=np.int64)
+    return popcount(tickets[:, None, :] & draws[None, :, :]).sum(axis=-1, dtype=np.int64)
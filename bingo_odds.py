@@ -0,0 +1,131 @@
+import math
+from functools import lru_cache
+import numpy as np
+from bingo_prize import PRIZE, COST, MAX_STAR
+
+# --- 賓果機率引擎：超幾何命中機率 x 獎金表 -> 期望值、變異數、獲利機率、破產機率 ---
+BALLS = 80
+DRAWN = 20
+UNIT = 25            # 獎金與成本都是 25 的倍數，分佈都在這個格點上算
+MAX_BASE = 12        # 一組策略最多用到的相異號碼數 (2^12 種命中情形)
+assert not (PRIZE % UNIT).any() and COST % UNIT == 0
+
+# HIT_PROB[k][h]：k 星 (選 k 個號碼) 恰好中 h 碼的機率
+HIT_PROB = np.zeros((MAX_STAR + 1, MAX_STAR + 1))
+for _k in range(1, MAX_STAR + 1):
+    for _h in range(_k + 1):
+        HIT_PROB[_k, _h] = math.comb(_k, _h) * math.comb(BALLS - _k, DRAWN - _h) / math.comb(BALLS, DRAWN)
+
+# --- 單期結果分佈 ---
+# tickets：[(號碼, 倍數), ...]，號碼只用來判斷注與注之間的重疊 (例如 [((1, 2, 3), 4)] 為三星 4 倍)
+# 列舉用到的 B 個號碼的每一種命中情形 (2^B 種)，精確算出同期多注之間的相關性
+# 回傳 (獎金 units, 機率, 每期成本 units)，獎金已合併相同值並由小到大排序
+@lru_cache(maxsize=256)
+def _period_outcomes(tickets):
+    base = sorted({n for nums, _ in tickets for n in nums})
+    if len(base) > MAX_BASE: raise ValueError(f"策略用到 {len(base)} 個號碼，最多 {MAX_BASE} 個")
+    pos = {n: i for i, n in enumerate(base)}
+    patterns = np.arange(1 << len(base))
+    hit_bits = ((patterns[:, None] >> np.arange(len(base))) & 1).astype(np.int64)
+    hits = hit_bits.sum(axis=1)
+    # 指定的 j 個號碼全中、其餘 B - j 個都沒中
+    prob = np.array([math.comb(BALLS - len(base), DRAWN - j) for j in range(len(base) + 1)], dtype=np.float64) / math.comb(BALLS, DRAWN)
+
+    prize = np.zeros(len(patterns), dtype=np.int64)
+    cost = 0
+    for nums, mult in tickets:
+        if not 1 <= len(nums) <= MAX_STAR: raise ValueError(f"星數 {len(nums)} 不在 1 ~ {MAX_STAR}")
+        ticket_hits = hit_bits[:, [pos[n] for n in nums]].sum(axis=1)
+        prize += PRIZE[len(nums), ticket_hits] * mult
+        cost += COST * mult
+
+    values, inverse = np.unique(prize // UNIT, return_inverse=True)
+    return values, np.bincount(inverse, weights=prob[hits]), cost // UNIT
+
+def period_outcomes(tickets):
+    return _period_outcomes(tuple((tuple(nums), int(mult)) for nums, mult in tickets))
+
+# --- 多期分佈 DP (期與期獨立)；dist 最後一維是格點，批次維度可有可無 ---
+# 獲利：累積獎金只增不減，超過門檻的全部併到最後一格
+def _add_prize(dist, units, probs):
+    size = dist.shape[-1]
+    out = np.zeros_like(dist)
+    for u, p in zip(units, probs):
+        if u < size:
+            out[..., u:] += p * dist[..., :size - u]
+            out[..., -1] += p * dist[..., size - u:].sum(axis=-1)
+        else:
+            out[..., -1] += p * dist.sum(axis=-1)
+    return out
+
+# 破產：本金 (units) 付不起下一期就出局；本金到 cap (夠付完剩下所有期) 就不可能破產，上方併入 cap
+def _play_period(dist, units, probs, cost):
+    ruined = dist[..., :cost].sum(axis=-1)
+    alive = dist.copy()
+    alive[..., :cost] = 0
+    return _add_prize(np.concatenate([alive[..., cost:], np.zeros(dist.shape[:-1] + (cost,))], axis=-1), units, probs), ruined
+
+# --- 策略評估：N 期的期望損益、標準差、獲利機率；給 bankroll (元) 時另算破產機率 ---
+def evaluate_strategy(tickets, periods, bankroll=None):
+    units, probs, cost = period_outcomes(tickets)
+    mean = float((units * probs).sum())
+    var = float(((units - mean) ** 2 * probs).sum())
+    result = {
+        "cost": cost * UNIT * periods,
+        "ev": (mean - cost) * UNIT * periods,
+        "std": math.sqrt(var * periods) * UNIT,
+        "hit_prob": float(probs[units > 0].sum()),
+    }
+    # 總獎金 > 總成本 (至少多 1 unit) 才算獲利
+    cap = cost * periods + 1
+    dist = np.zeros(cap + 1)
+    dist[0] = 1
+    for _ in range(periods): dist = _add_prize(dist, units, probs)
+    result["p_profit"] = float(dist[cap])
+    if bankroll is not None:
+        result["p_ruin"] = float(_ruin_curve(units, probs, cost, np.array([bankroll // UNIT]), periods)[0, -1])
+    return result
+
+# 各期 (1 ~ periods) 累積破產機率；start 為一批起始本金 (units)
+def _ruin_curve(units, probs, cost, start, periods):
+    cap = cost * periods
+    dist = np.zeros((len(start), cap + 1))
+    dist[np.arange(len(start)), np.minimum(start, cap)] = 1
+    ruined = np.zeros(len(start))
+    curve = np.zeros((len(start), periods))
+    for n in range(periods):
+        dist, lost = _play_period(dist, units, probs, cost)
+        ruined += lost
+        curve[:, n] = ruined
+    return curve
+
+# --- 單注 k 星 x m 倍 x N 期的整張風險表 (star 1 ~ 10、mult 1 ~ max_mult、period 1 ~ max_periods) ---
+# 倍數只是把獎金與成本同時放大：期望值與標準差直接乘上倍數，獲利機率與倍數無關，
+# 破產機率則是同一個 DP 換成不同起始本金 (bankroll / 每期成本)，整批一次算完。
+@lru_cache(maxsize=16)
+def star_grid(max_mult=100, max_periods=100, bankroll=1000):
+    stars = np.arange(1, MAX_STAR + 1)
+    mults = np.arange(1, max_mult + 1)
+    periods = np.arange(1, max_periods + 1)
+    shape = (len(stars), len(mults), len(periods))
+    grid = {name: np.zeros(shape) for name in ("ev", "std", "p_profit", "p_ruin")}
+    start = bankroll // (COST * mults)
+    for i, k in enumerate(stars):
+        units, probs, cost = period_outcomes([(tuple(range(k)), 1)])
+        mean = (units * probs).sum()
+        std = math.sqrt(((units - mean) ** 2 * probs).sum())
+        grid["ev"][i] = (mean - cost) * UNIT * mults[:, None] * periods[None, :]
+        grid["std"][i] = std * UNIT * mults[:, None] * np.sqrt(periods)[None, :]
+
+        dist = np.zeros(cost * max_periods + 2)
+        dist[0] = 1
+        for n in periods:
+            dist = _add_prize(dist, units, probs)
+            grid["p_profit"][i, :, n - 1] = dist[cost * n + 1:].sum()
+        grid["p_ruin"][i] = _ruin_curve(units, probs, cost, start, max_periods)
+    return grid
+
+# 指定開出號碼時一組策略的獎金 (元)
+def payout(tickets, drawn):
+    drawn = set(drawn)
+    return int(sum(PRIZE[len(nums), len(drawn.intersection(nums))] * mult for nums, mult in tickets))
@@ -0,0 +1,59 @@
+import re
+import numpy as np
+
+# 賓果 list.asp 快速解析：不經過 BeautifulSoup，全部交給編譯好的 regex (C 層) 處理
+# 先把 <tr> 換成分隔字元、其餘標籤換成空白 (避免屬性裡的數字混入)，再逐列抓連續數字。
+# Big5 的第二位元組不會落在 '<' '>' 或數字範圍，所以可以直接掃 res.content 省去解碼。
+TR_RE = re.compile(r'<tr\b[^>]*>', re.I)
+TAG_RE = re.compile(r'<[^>]*>')
+NUM_RE = re.compile(r'\d+')
+TR_RE_B = re.compile(rb'<tr\b[^>]*>', re.I)
+TAG_RE_B = re.compile(rb'<[^>]*>')
+NUM_RE_B = re.compile(rb'\d+')
+
+BALLS = 20
+# 號碼篩選列 (01 02 03 ...) 會被誤認成一期，前 5 碼是 1~5 的列直接略過
+JUNK_PREFIX = [1, 2, 3, 4, 5]
+
+# 期別格式 11[3-9]xxxxxx (民國 113~119 年)
+def _is_draw_id(t):
+    return len(t) == 9 and 113000000 <= int(t) < 120000000
+
+def _parse_row(tokens):
+    draw_id = next((t for t in tokens if _is_draw_id(t)), None)
+    if draw_id is None: return None, None
+    balls = []
+    mask = 0
+    for t in tokens:
+        if len(t) > 2: continue
+        val = int(t)
+        if 1 <= val <= 80 and not mask >> val & 1:
+            mask |= 1 << val
+            balls.append(val)
+            if len(balls) == BALLS: break
+    if len(balls) < BALLS: return None, None
+    balls.sort()
+    if balls[:5] == JUNK_PREFIX: return None, None
+    return int(draw_id), balls
+
+# --- 解析：回傳 (期別 int64 陣列, 號碼 uint8 陣列 [期數 x 20])，依頁面順序 (新到舊) ---
+def parse(html):
+    if isinstance(html, bytes):
+        chunks = TAG_RE_B.sub(b' ', TR_RE_B.sub(b'\0', html)).split(b'\0')
+        num_re = NUM_RE_B
+    else:
+        chunks = TAG_RE.sub(' ', TR_RE.sub('\0', html)).split('\0')
+        num_re = NUM_RE
+    ids, rows, seen_ids = [], [], set()
+    # 第一段是第一個 <tr> 之前的內容，不算一列
+    for chunk in chunks[1:]:
+        draw_id, balls = _parse_row(num_re.findall(chunk))
+        if draw_id is None or draw_id in seen_ids: continue
+        seen_ids.add(draw_id)
+        ids.append(draw_id)
+        rows.append(balls)
+    return np.array(ids, dtype=np.int64), np.array(rows, dtype=np.uint8).reshape(-1, BALLS)
+
+# 轉回各頁面使用的 [{"id": "115000001", "nums": [...]}] 格式
+def to_draws(ids, nums):
+    return [{"id": str(i), "nums": n} for i, n in zip(ids.tolist(), nums.tolist())]
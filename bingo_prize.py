@@ -0,0 +1,47 @@
+import numpy as np
+from bingo_features import to_masks, hit_counts
+
+# --- 賓果獎金表 (每注 $25，1 倍) ---
+PRIZE_TABLE = {
+    1: {1: 50}, 2: {1: 25, 2: 75}, 3: {2: 50, 3: 500},
+    4: {2: 25, 3: 100, 4: 1000}, 5: {3: 50, 4: 500, 5: 7500},
+    6: {3: 25, 4: 200, 5: 1000, 6: 25000}, 7: {3: 25, 4: 50, 5: 300, 6: 3000, 7: 80000},
+    8: {4: 25, 5: 100, 6: 800, 7: 20000, 8: 500000},
+    9: {4: 25, 5: 100, 6: 1000, 7: 3000, 8: 100000, 9: 1000000},
+    10: {5: 25, 6: 100, 7: 1000, 8: 5000, 9: 25000, 10: 5000000}
+}
+COST = 25
+MAX_STAR = 10
+
+# 編譯成 PRIZE[star][hits] 的密集陣列，超出範圍 (star 0、hits > star) 都是 0
+PRIZE = np.zeros((MAX_STAR + 1, MAX_STAR + 1), dtype=np.int64)
+for _star, _row in PRIZE_TABLE.items():
+    for _hits, _amount in _row.items(): PRIZE[_star, _hits] = _amount
+
+# --- 向量化損益：hits 為 (注數 T, 期數 N) 命中矩陣 (單注可傳 (N,)) ---
+# star / mult 可以是單一數值或每注一個值；期數順序由呼叫端決定 (累積曲線照此順序累加)
+def evaluate(hits, star, mult=1, cost=COST):
+    hits = np.asarray(hits, dtype=np.intp)
+    hits = hits.reshape(1, -1) if hits.ndim == 1 else hits
+    tickets = hits.shape[0]
+    star = np.broadcast_to(np.asarray(star, dtype=np.intp), (tickets,))
+    mult = np.broadcast_to(np.asarray(mult, dtype=np.int64), (tickets,))
+
+    prize = PRIZE[star[:, None], np.clip(hits, 0, MAX_STAR)] * mult[:, None]
+    stake = int((cost * mult).sum())
+    per_draw = prize.sum(axis=0) - stake
+    return {
+        "prize": prize,
+        "per_draw": per_draw,
+        "cumulative": np.cumsum(per_draw),
+        "cost": stake * hits.shape[1],
+        "win": int(prize.sum()),
+        "net": int(per_draw.sum()),
+        "ticket_net": prize.sum(axis=1) - cost * mult * hits.shape[1],
+    }
+
+# --- 1~10 星一次回測：ranked 為排序好的號碼，第 k 注取前 k 個號碼玩 k 星 (號碼不足 10 個就只到 len(ranked) 星) ---
+def star_ladder(ranked, draw_masks, mult=1, cost=COST):
+    stars = np.arange(1, min(MAX_STAR, len(ranked)) + 1)
+    tickets = np.concatenate([to_masks([list(ranked[:k])]) for k in stars])
+    return evaluate(hit_counts(tickets, draw_masks), stars, mult, cost)
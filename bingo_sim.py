@@ -0,0 +1,99 @@
+import math
+import numpy as np
+
+# 賓果每期開出 20 顆
+PICK = 20
+# 每批模擬的列數 (4096 x 80 x 4 bytes 約 1.3MB，放得進 L2)
+CHUNK_ROWS = 4096
+
+
+# --- 批次加權抽樣 (不放回) ---
+# 每一列是一次模擬開獎：對每個號碼產生 log(U) / w 的鍵值，取最大的 pick 個，
+# 其分佈與 np.random.choice(replace=False, p=w) 的逐顆抽樣完全相同 (Efraimidis-Spirakis)。
+# U 直接由 bit generator 的原始 32 位元組成 (0, 1) 的 float32，比 rng.random 快；
+# 鍵值 < 0，以 int32 看待時順序剛好相反且 partition 比 float32 快，所以取 int32 最小的 pick 個。
+def sample_counts(weights, trials, pick=PICK, rng=None, chunk_rows=CHUNK_ROWS):
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(weights) < pick: raise ValueError(f"號碼數量 {len(weights)} 少於抽出顆數 {pick}")
+    if rng is None: rng = np.random.default_rng()
+
+    with np.errstate(divide='ignore'):
+        inv = (1.0 / weights).astype(np.float32)
+    n = len(weights)
+    counts = np.zeros(n, dtype=np.int64)
+    bits = rng.bit_generator
+
+    done = 0
+    while done < trials:
+        rows = min(chunk_rows, trials - done)
+        size = rows * n
+        # 取 23 位元放進 [1, 2) 的尾數，f - (1 - 2^-24) 是 (0, 1) 格點中點上的均勻亂數 (精確相減，不會有 0 或 1)
+        raw = bits.random_raw((size + 1) // 2).view(np.uint32)[:size].reshape(rows, n)
+        raw >>= 9
+        raw |= np.uint32(0x3f800000)
+        keys = raw.view(np.float32)
+        keys -= np.float32(1 - 2 ** -24)
+        with np.errstate(over='ignore'):
+            np.log(keys, out=keys)
+            keys *= inv
+        order = keys.view(np.int32)
+        # 每列第 pick 小的值即為門檻，<= 門檻者就是該次抽中的 pick 顆
+        thresh = np.partition(order, pick - 1, axis=1)[:, pick - 1:pick]
+        hit = order <= thresh
+        hits = hit.view(np.uint8).sum(axis=0, dtype=np.int32)
+        counts += hits
+        # float32 鍵值偶爾會跟門檻同值，那幾列會多算；只把這些列改用 argpartition 取剛好 pick 顆
+        if hits.sum() > rows * pick:
+            tied = np.flatnonzero(np.count_nonzero(hit, axis=1) > pick)
+            counts -= np.count_nonzero(hit[tied], axis=0)
+            top = np.argpartition(order[tied], pick - 1, axis=1)[:, :pick]
+            counts += np.bincount(top.ravel(), minlength=n)
+        done += rows
+    return counts
+
+
+# --- 解析解：每個號碼被抽中的機率 (不放回逐顆加權抽樣，無抽樣誤差) ---
+# 逐顆抽樣等價於指數競賽：號碼 i 的到達時間 T_i ~ Exp(w_i)，最先到的 pick 個就是開出號碼，所以
+#   π_i = ∫ w_i e^(-w_i t) · P(其他號碼在 t 之前到達的個數 < pick) dt
+# 括號內是 Poisson-binomial 分佈，用前綴 / 後綴 DP (只保留 0 ~ pick-1 個) 一次得到所有「扣掉 i」的版本。
+# 權重差距可能很大 (例如 1e6 : 1)，各號碼的到達時間跨好幾個數量級，所以換成 u = log t 做 Gauss-Legendre 積分：
+#   - t < t0 時到達個數 >= pick 的機率 <= (t0 Σw)^pick / pick! < e^-36，這一段直接算 1 - e^(-w_i t0)
+#   - 上限取最輕的號碼也幾乎必定到達 (e^-40)；節點數跟著區間長度加，80 選 20 約數十毫秒
+QUAD_NODES = 256
+
+def inclusion_probs(weights, pick=PICK, nodes=QUAD_NODES):
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(weights) < pick: raise ValueError(f"號碼數量 {len(weights)} 少於抽出顆數 {pick}")
+    pos = weights > 0
+    # 正權重不足 pick 個：全部開出，剩下的名額由權重 0 的號碼平分
+    if pos.sum() <= pick:
+        return np.where(pos, 1.0, (pick - pos.sum()) / max(len(weights) - pos.sum(), 1))
+
+    r = weights[pos] / weights[pos].max()
+    m = len(r)
+    t0 = math.exp((math.lgamma(pick + 1) - 36) / pick) / r.sum()
+    lo, hi = math.log(t0), math.log(40 / r.min())
+    nodes = max(nodes, int(32 * (hi - lo)))
+    xg, wg = np.polynomial.legendre.leggauss(nodes)
+    t = np.exp(lo + (xg + 1) * (hi - lo) / 2)
+    wt = wg * (hi - lo) / 2
+    stay = np.exp(-t[:, None] * r[None, :])      # 到 t 時還沒到達的機率
+    came = -np.expm1(-t[:, None] * r[None, :])
+
+    pre = np.zeros((m + 1, nodes, pick))
+    pre[0, :, 0] = 1
+    for j in range(m):
+        pre[j + 1] = pre[j] * stay[:, j:j + 1]
+        pre[j + 1, :, 1:] += pre[j, :, :-1] * came[:, j:j + 1]
+    suf = np.zeros((m + 1, nodes, pick))
+    suf[m, :, 0] = 1
+    for j in range(m - 1, -1, -1):
+        suf[j] = suf[j + 1] * stay[:, j:j + 1]
+        suf[j, :, 1:] += suf[j + 1, :, :-1] * came[:, j:j + 1]
+    # 扣掉 i 後到達個數 < pick 的機率 = Σ_a pre[i][a] · P(後綴 <= pick-1-a)
+    below = np.einsum('itk,itk->ti', pre[:m], np.cumsum(suf, axis=2)[1:, :, ::-1])
+    density = r[None, :] * t[:, None] * stay      # dt = t du
+
+    probs = np.zeros(len(weights))
+    probs[pos] = np.clip(-np.expm1(-r * t0) + (wt[:, None] * density * below).sum(axis=0), 0, 1)
+    return probs
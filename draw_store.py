@@ -0,0 +1,52 @@
+import os
+import sqlite3
+from contextlib import closing
+
+# 本地開獎資料庫：以 (彩種, 期別) 為主鍵，重啟也不會遺失歷史
+# 彩種代碼沿用 pilio 的路徑名稱：bingo / ltobig / lto / lto539
+DB_PATH = os.environ.get("BINGO_DRAW_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "draws.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    game TEXT NOT NULL,
+    draw_id TEXT NOT NULL,
+    nums TEXT NOT NULL,
+    special TEXT,
+    PRIMARY KEY (game, draw_id)
+) WITHOUT ROWID
+"""
+
+def connect(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(SCHEMA)
+    return conn
+
+# --- 寫入：只新增尚未存在的期別 ---
+def insert_new(game, draws, path=None):
+    # draws: [{"id": 期別, "nums": [號碼...], "special": 特別號 (可省略)}]
+    rows = [(game, str(d['id']), " ".join(str(int(n)) for n in d['nums']), d.get('special')) for d in draws]
+    if not rows: return 0
+    with closing(connect(path)) as conn, conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO draws (game, draw_id, nums, special) VALUES (?, ?, ?, ?)", rows)
+        return conn.total_changes - before
+
+# --- 讀取：由新到舊，limit=None 代表全部歷史 ---
+def load(game, limit=None, path=None):
+    sql = "SELECT draw_id, nums, special FROM draws WHERE game = ? ORDER BY draw_id DESC"
+    params = [game]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    with closing(connect(path)) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [{"id": draw_id, "nums": [int(n) for n in nums.split()], "special": special} for draw_id, nums, special in rows]
+
+def known_ids(game, path=None):
+    with closing(connect(path)) as conn:
+        return {r[0] for r in conn.execute("SELECT draw_id FROM draws WHERE game = ?", (game,))}
+
+def count(game, path=None):
+    with closing(connect(path)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM draws WHERE game = ?", (game,)).fetchone()[0]
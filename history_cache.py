@@ -0,0 +1,45 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# 全程序共用的開獎歷史快取：所有 session 看同一份資料，同一個 key 同時只會有一個抓取在跑
+TAIPEI = timezone(timedelta(hours=8))
+DRAW_PERIOD = 300      # 賓果每 5 分鐘一期
+FIRST_DRAW = (7, 5)    # 每日第一期 07:05
+LAST_DRAW = (23, 55)   # 每日最後一期 23:55
+GRACE = 30             # 開獎後網站更新需要一點時間
+FAILURE_TTL = 30       # 抓取失敗時多久後重試
+MIN_REFRESH = 10       # 強制重刷的最短間隔，避免多人同時按鈕打爆上游
+
+# key -> (資料, 到期時間, 抓取時間)
+_entries = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+# 距離下一期開獎 (加上 GRACE) 還有幾秒；夜間停開時算到隔天第一期
+def ttl_to_next_draw(now=None):
+    now = (now or datetime.now(TAIPEI)) - timedelta(seconds=GRACE)
+    first = now.replace(hour=FIRST_DRAW[0], minute=FIRST_DRAW[1], second=0, microsecond=0)
+    last = now.replace(hour=LAST_DRAW[0], minute=LAST_DRAW[1], second=0, microsecond=0)
+    if now < first: nxt = first
+    elif now >= last: nxt = first + timedelta(days=1)
+    else: nxt = first + timedelta(seconds=((now - first).total_seconds() // DRAW_PERIOD + 1) * DRAW_PERIOD)
+    return (nxt - now).total_seconds()
+
+def _lock_for(key):
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+# ok(資料) 為 False 的結果 (抓取失敗、模擬資料) 只保留 FAILURE_TTL 秒
+def get(key, loader, ok=bool, force=False):
+    entry = _entries.get(key)
+    if entry and not force and time.time() < entry[1]: return entry[0]
+    with _lock_for(key):
+        # 等鎖的期間別人可能已經抓好了
+        entry = _entries.get(key)
+        now = time.time()
+        if entry and ((not force and now < entry[1]) or now - entry[2] < MIN_REFRESH): return entry[0]
+        value = loader()
+        ttl = ttl_to_next_draw() if ok(value) else FAILURE_TTL
+        _entries[key] = (value, now + ttl, now)
+        return value
@@ -0,0 +1,247 @@
+import os
+import json
+import math
+import itertools
+import tempfile
+import numpy as np
+from bingo_features import popcount
+
+# 樂透組合空間：整個 C(n, k) 依字典序編號 (rank)，一次算好六大特徵存成特徵表檔，
+# 之後用 np.memmap 唯讀載入 (多個程序透過 page cache 共用)，任意濾網都是整欄陣列運算。
+# 彩種代碼同 draw_store：ltobig 大樂透 / lto 威力彩 / lto539 今彩539
+# rules：每個特徵的允許範圍 (含兩端)，None 代表不設限
+GAMES = {
+    "ltobig": {"max_n": 49, "pick": 6, "rules": {"sum": (115, 185), "ac": (7, None), "odd": (2, 4),
+                                                 "consecutive": (0, 1), "prime": (1, 3), "zone": (3, None)}},
+    "lto":    {"max_n": 38, "pick": 6, "rules": {"sum": (85, 145), "ac": (7, None), "odd": (2, 4),
+                                                 "consecutive": (0, 1), "prime": (1, 3), "zone": (3, None)}},
+    "lto539": {"max_n": 39, "pick": 5, "rules": {"sum": (75, 125), "ac": (4, None), "odd": (2, 3),
+                                                 "consecutive": (0, 1), "prime": (1, 3), "zone": (3, None)}},
+}
+FEATURES = ("sum", "ac", "odd", "consecutive", "prime", "zone")
+FILTER_LABELS = {"sum": "總和", "ac": "AC值", "odd": "奇偶", "consecutive": "連號", "prime": "質數", "zone": "區間"}
+
+CACHE_DIR = os.environ.get("LOTTO_COMBO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "combo_cache"))
+CHUNK = 1 << 20
+TABLE_FORMAT = 1
+KERNEL_CHUNK = 1 << 16   # 特徵計算的分批大小，讓中間陣列留在快取裡
+MAX_NUM = 63             # 差值位元集合只用一個 uint64
+_BIT = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+def _primes_table(max_n):
+    table = np.zeros(max_n + 1, dtype=np.uint8)
+    for n in range(2, max_n + 1):
+        table[n] = all(n % d for d in range(2, int(n**0.5) + 1))
+    return table
+
+def enumerate_combos(game):
+    cfg = GAMES[game]
+    n, k = cfg["max_n"], cfg["pick"]
+    total = math.comb(n, k)
+    flat = itertools.chain.from_iterable(itertools.combinations(range(1, n + 1), k))
+    return np.fromiter(flat, dtype=np.uint8, count=total * k).reshape(total, k)
+
+# 依 rank 順序分批列舉，建表時記憶體只需要一批的量
+def iter_combos(game, chunk=CHUNK):
+    cfg = GAMES[game]
+    n, k = cfg["max_n"], cfg["pick"]
+    combos = itertools.combinations(range(1, n + 1), k)
+    for start in range(0, math.comb(n, k), chunk):
+        rows = min(chunk, math.comb(n, k) - start)
+        flat = itertools.chain.from_iterable(itertools.islice(combos, rows))
+        yield start, np.fromiter(flat, dtype=np.uint8, count=rows * k).reshape(rows, k)
+
+# rank -> 組合 (字典序)：第 i 位挑 v 時，前面跳過的組合數可用 C(n - p, j) - C(n - v + 1, j) 一次算出
+# (p 為前一位、j 為剩餘位數 + 1)，所以每一位只要一次 searchsorted
+def unrank(ranks, game):
+    cfg = GAMES[game]
+    n, k = cfg["max_n"], cfg["pick"]
+    r = np.array(ranks, dtype=np.int64, ndmin=1)
+    out = np.empty((len(r), k), dtype=np.uint8)
+    prev = np.zeros(len(r), dtype=np.int64)
+    for i in range(k):
+        j = k - i
+        comb = np.array([math.comb(m, j) for m in range(n + 1)], dtype=np.int64)
+        target = comb[n - prev] - r
+        m = np.searchsorted(comb, target, side='left')
+        r -= comb[n - prev] - comb[m]
+        prev = n - m + 1
+        out[:, i] = prev
+    return out
+
+# --- 六大特徵 (向量化)：combos 為每列已排序的 (M, pick) 號碼陣列 (1 ~ 63) ---
+# 回傳 {特徵: (M,) 陣列}：總和、AC 值、奇數個數、連號組數 (相鄰差 1 的對數)、質數個數、區間數 (n // 10)
+# 逐欄運算、分批處理，單核每秒可算數百萬組
+_PRIMES = _primes_table(MAX_NUM)
+
+def _features_chunk(combos, out):
+    k = combos.shape[1]
+    cols = [np.ascontiguousarray(combos[:, i]) for i in range(k)]
+    s, odd, prime, cons, zone = out["sum"], out["odd"], out["prime"], out["consecutive"], out["zone"]
+    zone[:] = 1
+    for x in cols:
+        s += x
+        odd += x & 1
+        prime += _PRIMES[x]
+    for a, b in zip(cols, cols[1:]):
+        cons += (b - a) == 1
+        zone += (b // 10) != (a // 10)
+    # AC 值：所有兩兩差值的相異個數 - (k - 1)；差值以 uint64 位元集合去重
+    bits = np.zeros(len(combos), dtype=np.uint64)
+    for i, j in itertools.combinations(range(k), 2):
+        bits |= _BIT[cols[j] - cols[i]]
+    out["ac"][:] = popcount(bits) - (k - 1)
+
+def combo_features(combos):
+    combos = np.asarray(combos, dtype=np.uint8)
+    combos = combos.reshape(1, -1) if combos.ndim == 1 else combos
+    feats = {name: np.zeros(len(combos), dtype=np.uint16 if name == "sum" else np.uint8) for name in FEATURES}
+    for start in range(0, len(combos), KERNEL_CHUNK):
+        _features_chunk(combos[start:start + KERNEL_CHUNK], {name: arr[start:start + KERNEL_CHUNK] for name, arr in feats.items()})
+    return feats
+
+# --- 濾網規則：features 為 combo_features 的結果，rules 預設用該彩種的 GAMES 設定 ---
+def filter_checks(features, rules):
+    checks = {}
+    for name, (lo, hi) in rules.items():
+        v = features[name]
+        ok = np.ones(len(v), dtype=bool) if lo is None else v >= lo
+        if hi is not None: ok &= v <= hi
+        checks[name] = ok
+    return checks
+
+def filter_mask(features, rules):
+    return np.logical_and.reduce(list(filter_checks(features, rules).values()))
+
+# --- 特徵表：{game}_features.bin 依 FEATURES 順序逐欄存放 (每欄 total 筆)，欄位配置記在 {game}_features.json ---
+def _table_paths(game, cache_dir):
+    base = os.path.join(cache_dir or CACHE_DIR, f"{game}_features")
+    return base + ".bin", base + ".json"
+
+def _table_layout(game):
+    cfg = GAMES[game]
+    total = math.comb(cfg["max_n"], cfg["pick"])
+    columns, offset = {}, 0
+    for name in FEATURES:
+        dtype = np.dtype(np.uint16 if name == "sum" else np.uint8)
+        columns[name] = {"dtype": dtype.str, "offset": offset}
+        offset += total * dtype.itemsize
+    return {"format": TABLE_FORMAT, "max_n": cfg["max_n"], "pick": cfg["pick"], "total": total, "columns": columns}
+
+def _open_columns(path, layout, mode):
+    return {name: np.memmap(path, dtype=col["dtype"], mode=mode, offset=col["offset"], shape=(layout["total"],))
+            for name, col in layout["columns"].items()}
+
+# 同目錄下的唯一暫存檔：多個程序 / session 同時建同一張表時各寫各的，最後 os.replace 的一定是寫完的檔
+def _temp_path(path):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    return tmp
+
+def build_tables(game, cache_dir=None):
+    bin_path, meta_path = _table_paths(game, cache_dir)
+    os.makedirs(os.path.dirname(bin_path), exist_ok=True)
+    layout = _table_layout(game)
+    tmp, meta_tmp = _temp_path(bin_path), _temp_path(meta_path)
+    try:
+        size = sum(layout["total"] * np.dtype(col["dtype"]).itemsize for col in layout["columns"].values())
+        with open(tmp, "wb") as f: f.truncate(size)
+        columns = _open_columns(tmp, layout, "r+")
+        for start, combos in iter_combos(game):
+            feats = combo_features(combos)
+            for name, arr in columns.items(): arr[start:start + len(combos)] = feats[name]
+        for arr in columns.values(): arr.flush()
+        del columns
+        with open(meta_tmp, "w", encoding="utf-8") as f: json.dump(layout, f)
+        # 先換資料檔再換配置檔：配置檔存在且相符才算建好
+        os.replace(tmp, bin_path)
+        os.replace(meta_tmp, meta_path)
+    finally:
+        for path in (tmp, meta_tmp):
+            if os.path.exists(path): os.remove(path)
+    return layout
+
+# 唯讀載入特徵表，不存在或格式不符就先建表；回傳 {特徵: memmap}，索引即 rank
+def load_tables(game, cache_dir=None):
+    bin_path, meta_path = _table_paths(game, cache_dir)
+    layout = None
+    if os.path.exists(meta_path) and os.path.exists(bin_path):
+        with open(meta_path, encoding="utf-8") as f: layout = json.load(f)
+    if layout != json.loads(json.dumps(_table_layout(game))): layout = build_tables(game, cache_dir)
+    return _open_columns(bin_path, layout, "r")
+
+# 濾網查詢：回傳通過的 rank (uint32) 與各濾網通過數
+def query(tables, rules):
+    checks = filter_checks(tables, rules)
+    keep = np.logical_and.reduce(list(checks.values()))
+    stats = {"total": len(keep), "valid": int(keep.sum()), "passed": {name: int(ok.sum()) for name, ok in checks.items()}}
+    return np.flatnonzero(keep).astype(np.uint32), stats
+
+def load_index(game, rules=None, cache_dir=None):
+    tables = load_tables(game, cache_dir)
+    return query(tables, rules or GAMES[game]["rules"])
+
+# 從有效 rank 中均勻抽出 count 個 (不重複)
+def sample_tickets(valid, count, rng=None):
+    rng = rng or np.random.default_rng()
+    return valid[rng.choice(len(valid), size=min(count, len(valid)), replace=False)]
+
+# --- 多注組合 (portfolio)：從有效組合中貪婪挑 count 注 ---
+# cover=2 / 3：每一步挑「新涵蓋的相異二碼 / 三碼組最多」的一注；cover=0：挑與已選注單重疊號碼最少的一注
+# 候選為從有效組合抽出的 pool 注；每注的子集編成整數 id，已涵蓋與否是一張平坦的位元表，每步只要一次 (pool, 子集數) 的查表
+PORTFOLIO_POOL = 4000
+
+def _subset_ids(combos, max_n, order):
+    base = max_n + 1
+    ids = []
+    for idx in itertools.combinations(range(combos.shape[1]), order):
+        sid = np.zeros(len(combos), dtype=np.int64)
+        for i in idx: sid = sid * base + combos[:, i]
+        ids.append(sid)
+    return np.stack(ids, axis=1), base ** order
+
+def build_portfolio(valid, count, game, cover=2, pool=None, rng=None):
+    rng = rng or np.random.default_rng()
+    max_n = GAMES[game]["max_n"]
+    ranks = sample_tickets(valid, max(pool or PORTFOLIO_POOL, 4 * count), rng)
+    combos = unrank(ranks, game)
+    count = min(count, len(ranks))
+    taken = np.zeros(len(ranks), dtype=bool)
+    chosen = []
+
+    if cover:
+        ids, space = _subset_ids(combos, max_n, cover)
+        covered = np.zeros(space, dtype=bool)
+        for _ in range(count):
+            gain = (~covered[ids]).sum(axis=1)
+            gain[taken] = -1
+            best = int(np.argmax(gain))
+            covered[ids[best]] = True
+            taken[best] = True
+            chosen.append(best)
+        stats = {"cover": cover, "covered": int(covered.sum()), "possible": math.comb(max_n, cover)}
+    else:
+        masks = np.bitwise_or.reduce(np.left_shift(np.uint64(1), combos.astype(np.uint64)), axis=1)
+        overlap = np.zeros(len(ranks), dtype=np.int64)
+        for _ in range(count):
+            score = np.where(taken, np.iinfo(np.int64).max, overlap)
+            best = int(np.argmin(score))
+            overlap += popcount(masks & masks[best])
+            taken[best] = True
+            chosen.append(best)
+        sel = masks[chosen]
+        stats = {"cover": 0, "max_overlap": int(popcount(sel[:, None] & sel[None, :]).max(initial=0, where=~np.eye(len(sel), dtype=bool))),
+                 "numbers": int(popcount(np.bitwise_or.reduce(sel))) if len(sel) else 0}
+    return ranks[chosen], stats
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="建立樂透組合特徵表")
+    parser.add_argument("games", nargs="*", help="ltobig / lto / lto539，省略則全部建立")
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+    for game in args.games or GAMES:
+        t = time.perf_counter()
+        layout = build_tables(game, args.cache_dir)
+        print(f"{game}: {layout['total']:,} 組, {time.perf_counter() - t:.1f}s -> {_table_paths(game, args.cache_dir)[0]}")
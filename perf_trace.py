@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+
+# 分段計時：每個頁面的 fetch (等上游回應) / decode (下載與解壓) / parse / compute / render，
+# 全程序共用，每個 (頁面, 階段) 保留最近 WINDOW 筆，用百分位數與直方圖看哪一段在負載下最慢。
+# BINGO_PERF_LOG=路徑 -> 每筆計時寫成一行 JSON；BINGO_METRICS_PORT=埠號 -> http://127.0.0.1:埠號/metrics 提供摘要 JSON
+STAGES = ("fetch", "decode", "parse", "compute", "render")
+WINDOW = 2000
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)   # 直方圖上界 (ms)，最後一格為更慢
+LOG_PATH = os.environ.get("BINGO_PERF_LOG")
+METRICS_PORT = int(os.environ.get("BINGO_METRICS_PORT") or 0)
+
+# (頁面, 階段) -> deque[ms]；頁面 -> deque[上游回應]
+_samples = {}
+_upstream = {}
+_lock = threading.Lock()
+_server = None
+
+
+def record(app, stage, ms):
+    with _lock:
+        _samples.setdefault((app, stage), deque(maxlen=WINDOW)).append(ms)
+    _log({"app": app, "stage": stage, "ms": round(ms, 3)})
+    _ensure_server()
+
+class Timer:
+    def __init__(self, app, name):
+        self.app = app
+        self.name = name
+        self.ms = None
+
+    def start(self):
+        self.began = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self.ms is None:
+            self.ms = (time.perf_counter() - self.began) * 1000
+            record(self.app, self.name, self.ms)
+        return self.ms
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# with perf_trace.stage(app, "parse"): ...
+def stage(app, name):
+    return Timer(app, name)
+
+# 沒辦法用 with 包住的區段 (例如整個頁面的 render)：start() 後在結尾呼叫 stop()
+def start(app, name):
+    return Timer(app, name).start()
+
+# 實際傳輸的大小 (gzip 壓縮後)：有 Content-Length 就用，分塊傳輸時改用 urllib3 從連線讀到的位元組數
+def _wire_bytes(res):
+    length = res.headers.get("Content-Length", "")
+    if length.isdigit(): return int(length)
+    try: return int(res.raw.tell())
+    except Exception: return len(res.content)
+
+# 上游回應：狀態碼、傳輸大小 (bytes) 與解壓後大小 (decoded)，以及 pilio_client 量到的 fetch / decode 時間
+def response(app, res):
+    timings = getattr(res, "timings", {})
+    for name, ms in timings.items(): record(app, name, ms)
+    info = {"time": time.time(), "status": res.status_code, "bytes": _wire_bytes(res), "decoded": len(res.content), "url": res.url, **timings}
+    with _lock:
+        _upstream.setdefault(app, deque(maxlen=WINDOW)).append(info)
+    _log({"app": app, "upstream": info})
+
+def _log(entry):
+    if not LOG_PATH: return
+    line = json.dumps({"ts": round(time.time(), 3), **entry}, ensure_ascii=False)
+    with _lock, open(LOG_PATH, "a", encoding="utf-8") as f: f.write(line + "\n")
+
+
+# --- 摘要：各階段的次數、最近一次、百分位數與直方圖 ---
+def _stats(values):
+    arr = np.asarray(values, dtype=np.float64)
+    p50, p90, p99 = np.percentile(arr, [50, 90, 99])
+    hist = np.bincount(np.searchsorted(BUCKETS, arr), minlength=len(BUCKETS) + 1)
+    return {"count": len(arr), "last": float(arr[-1]), "mean": float(arr.mean()), "p50": float(p50), "p90": float(p90),
+            "p99": float(p99), "max": float(arr.max()), "hist": hist.tolist()}
+
+def summary(app=None):
+    with _lock:
+        samples = {k: list(v) for k, v in _samples.items() if app is None or k[0] == app}
+        upstream = {k: list(v) for k, v in _upstream.items() if app is None or k == app}
+    out = {}
+    for (name, st_name), values in samples.items():
+        out.setdefault(name, {"stages": {}, "upstream": {}})["stages"][st_name] = _stats(values)
+    for name, responses in upstream.items():
+        statuses = {}
+        for r in responses: statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+        out.setdefault(name, {"stages": {}, "upstream": {}})["upstream"] = {
+            "count": len(responses), "status": statuses, "last": responses[-1],
+            "bytes_mean": float(np.mean([r["bytes"] for r in responses])),
+            "decoded_mean": float(np.mean([r["decoded"] for r in responses]))}
+    for entry in out.values():
+        entry["stages"] = {s: entry["stages"][s] for s in sorted(entry["stages"], key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES))}
+    return out
+
+def last(app, name):
+    with _lock:
+        values = _samples.get((app, name))
+        return values[-1] if values else None
+
+# 最近一次上游請求的總延遲 (fetch + decode)，沒有紀錄時回傳 None
+def upstream_latency(app):
+    with _lock:
+        values = _upstream.get(app)
+        return values[-1].get("fetch", 0) + values[-1].get("decode", 0) if values else None
+
+
+# --- 本地 metrics 端點 (每個程序只啟動一次) ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = json.dumps({"buckets_ms": BUCKETS, "apps": summary()}, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def _ensure_server():
+    global _server
+    if not METRICS_PORT or _server is not None: return
+    with _lock:
+        if _server is not None: return
+        try:
+            _server = ThreadingHTTPServer(("127.0.0.1", METRICS_PORT), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        except OSError:
+            # 埠號被占用 (例如另一個頁面已經開了)，不再重試
+            _server = False
+
+
+# --- 側欄診斷面板 ---
+def sidebar_panel(app):
+    import streamlit as st
+    import pandas as pd
+    data = summary(app).get(app)
+    with st.sidebar.expander("🩺 效能診斷", expanded=False):
+        if not data:
+            st.caption("尚無計時資料")
+            return
+        stages = data["stages"]
+        st.dataframe(pd.DataFrame([{"階段": s, "次數": v["count"], "最近": v["last"], "p50": v["p50"], "p90": v["p90"], "p99": v["p99"], "最大": v["max"]}
+                                   for s, v in stages.items()]).set_index("階段").round(1), use_container_width=True)
+        up = data["upstream"]
+        if up:
+            st.caption(f"上游：最近 HTTP {up['last']['status']}，傳輸 {up['last']['bytes'] / 1024:.1f} KB (解壓後 {up['last']['decoded'] / 1024:.1f} KB)；"
+                       f"狀態分佈 {', '.join(f'{k}×{v}' for k, v in sorted(up['status'].items()))}；平均傳輸 {up['bytes_mean'] / 1024:.1f} KB")
+        pick = st.selectbox("直方圖 (ms)", list(stages), key=f"perf_hist_{app}")
+        labels = [f"≤{b}" for b in BUCKETS] + [f">{BUCKETS[-1]}"]
+        st.bar_chart(pd.DataFrame({"次數": stages[pick]["hist"]}, index=pd.Index(labels, name="ms")), height=160)
+        st.download_button("下載 JSON", json.dumps(data, ensure_ascii=False), file_name=f"{app}_perf.json", mime="application/json", key=f"perf_json_{app}")
+        if _server: st.caption(f"metrics：http://127.0.0.1:{METRICS_PORT}/metrics")
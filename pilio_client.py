@@ -0,0 +1,61 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# 共用的 pilio 連線：keep-alive 連線池 + gzip + 條件式請求 (ETag / Last-Modified)
+HEADERS = {'User-Agent': 'Mozilla/5.0', 'Accept-Encoding': 'gzip, deflate'}
+POOL_SIZE = 16
+# 上游網址，可用 PILIO_BASE_URL 指到本地替身 (pilio_replay.py) 做壓測
+BASE_URL = os.environ.get("PILIO_BASE_URL", "https://www.pilio.idv.tw").rstrip("/")
+
+_session = None
+_session_lock = threading.Lock()
+# url -> {'ETag': ..., 'Last-Modified': ...}
+_validators = {}
+
+def session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                s.headers.update(HEADERS)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+def url(path):
+    return BASE_URL + path
+
+# --- GET：帶上次的驗證標頭，伺服器回 304 時呼叫端可直接略過解析 ---
+# 新的驗證標頭先掛在 res.validators，呼叫端把頁面解析並存好後再 commit(res)；
+# 中途失敗就不 commit，下次仍帶舊標頭，上游會再回一次完整頁面，不會被 304 吃掉沒存到的期別
+# res.timings：fetch = 送出到收到標頭 (ms)，decode = 讀完 body 含 gzip 解壓 (ms)，給 perf_trace 用
+def get(url, timeout=10, verify=False, conditional=True):
+    headers = {}
+    if conditional:
+        cached = _validators.get(url, {})
+        if 'ETag' in cached: headers['If-None-Match'] = cached['ETag']
+        if 'Last-Modified' in cached: headers['If-Modified-Since'] = cached['Last-Modified']
+    t = time.perf_counter()
+    res = session().get(url, headers=headers, timeout=timeout, verify=verify, stream=True)
+    t_head = time.perf_counter()
+    res.content
+    res.timings = {"fetch": (t_head - t) * 1000, "decode": (time.perf_counter() - t_head) * 1000}
+    res.validator_url = url
+    res.validators = {k: res.headers[k] for k in ('ETag', 'Last-Modified') if k in res.headers} if res.status_code == 200 else None
+    res.encoding = 'big5'
+    return res
+
+# 頁面內容已經存好：記下這次的驗證標頭 (沒有標頭就清掉，下次改抓完整頁面)
+def commit(res):
+    if res.validators is None: return
+    if res.validators: _validators[res.validator_url] = res.validators
+    else: _validators.pop(res.validator_url, None)
+
+def not_modified(res):
+    return res.status_code == 304
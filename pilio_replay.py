@@ -0,0 +1,305 @@
+import os
+import glob
+import gzip
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import bingo_parser
+import draw_store
+
+# pilio 本地替身：用 Big5 頁面重播 bingo / ltobig / lto / lto539 的 list.asp (含 indexpage 分頁)，
+# 時鐘每隔 interval 秒開出新的一期，另可注入延遲、限流與錯誤，用來量測刷新延遲與爬蟲吞吐量。
+#   python pilio_replay.py --port 8765 --latency 300 --error-rate 0.05
+#   PILIO_BASE_URL=http://127.0.0.1:8765 streamlit run bingo_ai.py
+# 歷史來源依序為：--capture-dir 裡擷取下來的 {game}_list_p*.html (賓果)、--seed-db 的 draw_store、亂數產生；
+# 不足 SYNTHETIC_DRAWS 期的部分以亂數期別往前補齊。
+GAMES = {
+    "bingo":  {"title": "賓果賓果", "max_n": 80, "pick": 20, "special": None, "rows": 60},
+    "ltobig": {"title": "大樂透",   "max_n": 49, "pick": 6,  "special": 49,   "rows": 30},
+    "lto":    {"title": "威力彩",   "max_n": 38, "pick": 6,  "special": 8,    "rows": 30},
+    "lto539": {"title": "今彩539",  "max_n": 39, "pick": 5,  "special": None, "rows": 30},
+}
+SYNTHETIC_DRAWS = {"bingo": 5000, "ltobig": 400, "lto": 400, "lto539": 400}
+BINGO_LATEST = 115061234
+WEEKDAYS = "一二三四五六日"
+CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures")
+
+
+def _random_draw(game, key):
+    cfg = GAMES[game]
+    rng = random.Random(f"{game}:{key}")
+    balls = rng.sample(range(1, cfg["max_n"] + 1), cfg["pick"] + 1)
+    # 大樂透的特別號從同一池抽出；威力彩第二區另外抽
+    special = balls[-1] if game == "ltobig" else (rng.randint(1, cfg["special"]) if cfg["special"] else None)
+    return {"id": str(key), "nums": sorted(balls[:-1]), "special": special}
+
+# 樂透期別以開獎日期表示：開獎星期 (週一 = 0) -> 到下一期的天數
+# 大樂透週二 / 五、威力彩週一 / 四、今彩539 週一到週六
+DRAW_STEPS = {
+    "ltobig": {1: 3, 4: 4},
+    "lto":    {0: 3, 3: 4},
+    "lto539": {0: 1, 1: 1, 2: 1, 3: 1, 4: 1, 5: 2},
+}
+
+def _to_date(draw_id):
+    return date(*map(int, draw_id.split("/")))
+
+# 不是開獎日的日期往前退到最近一次開獎日
+def _latest_draw_day(game, d):
+    while d.weekday() not in DRAW_STEPS[game]: d -= timedelta(days=1)
+    return d
+
+def _next_id(game, draw_id):
+    if game == "bingo": return str(int(draw_id) + 1)
+    d = _latest_draw_day(game, _to_date(draw_id))
+    return (d + timedelta(days=DRAW_STEPS[game][d.weekday()])).strftime("%Y/%m/%d")
+
+def _prev_id(game, draw_id):
+    if game == "bingo": return str(int(draw_id) - 1)
+    d = _latest_draw_day(game, _to_date(draw_id) - timedelta(days=1))
+    return d.strftime("%Y/%m/%d")
+
+def seed_history(game, capture_dir=None, seed_db=False):
+    draws = []
+    if game == "bingo" and capture_dir:
+        seen = set()
+        for path in sorted(glob.glob(os.path.join(capture_dir, f"{game}_list_p*.html")), key=lambda p: int(p.rsplit("_p", 1)[1].split(".")[0])):
+            with open(path, "rb") as f: ids, nums = bingo_parser.parse(f.read())
+            for d in bingo_parser.to_draws(ids, nums):
+                if d["id"] not in seen: seen.add(d["id"]); draws.append(d)
+    if not draws and seed_db: draws = draw_store.load(game)
+    if not draws:
+        latest = str(BINGO_LATEST) if game == "bingo" else _latest_draw_day(game, date.today()).strftime("%Y/%m/%d")
+        draws = [_random_draw(game, latest)]
+    # 歷史不夠深時往前補亂數期別，讓回補 / 分頁測試有足夠的頁數
+    while len(draws) < SYNTHETIC_DRAWS[game]: draws.append(_random_draw(game, _prev_id(game, draws[-1]["id"])))
+    return draws
+
+
+# --- 開獎時間軸：擷取的歷史 + 時鐘開出的新期別 (由新到舊) ---
+class Timeline:
+    def __init__(self, game, history, interval):
+        self.game = game
+        self.history = history
+        self.interval = interval
+        self.started = time.monotonic()
+        self.fresh = []          # 時鐘開出的新期別 (由舊到新)
+        self.manual = 0          # 手動推進的期數
+        self.opened_at = time.time()
+        self.lock = threading.Lock()
+
+    def advance(self, n=1):
+        with self.lock: self.manual += n
+        return self.draws()[0]
+
+    def draws(self):
+        with self.lock:
+            due = self.manual + (int((time.monotonic() - self.started) / self.interval) if self.interval > 0 else 0)
+            while len(self.fresh) < due:
+                last = self.fresh[-1] if self.fresh else self.history[0]
+                self.fresh.append(_random_draw(self.game, _next_id(self.game, last["id"])))
+                self.opened_at = time.time()
+            return self.fresh[::-1] + self.history
+
+
+# --- 頁面：版面照 pilio 擷取頁，解析器看到的結構 (含號碼篩選列) 與真實頁面相同 ---
+def _page_shell(cfg, body, page, pages):
+    links = " ".join(f'<a href="list.asp?indexpage={p}">{p}</a>' for p in range(max(1, page - 5), min(pages, page + 5) + 1))
+    return "\r\n".join([
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">',
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head>',
+        '<meta http-equiv="Content-Type" content="text/html; charset=big5" />',
+        f'<title>{cfg["title"]} 開獎號碼 - 樂透彩幸運網</title>',
+        '</head><body>',
+        body,
+        f'<table width="980" align="center"><tr><td align="center">頁次：{links}</td></tr></table>',
+        '<div class="footer">Copyright &copy; 2003-2026 樂透彩幸運網 All Rights Reserved.</div></body></html>',
+    ]) + "\r\n"
+
+def render_bingo(rows, page, pages):
+    cfg = GAMES["bingo"]
+    out = ['<form action="list.asp" method="get"><table width="980" align="center" class="auto-style1"><tr><td>號碼查詢：' +
+           "".join(f'<input type="checkbox" name="n" value="{n}" />{n:02d} ' for n in range(1, 81)) + '</td></tr></table></form>',
+           '<table width="980" border="1" align="center" cellpadding="3" cellspacing="0" class="auto-style1">',
+           '<tr class="title"><td width="120" align="center">期別</td><td align="center">開獎號碼 (依大小順序)</td><td width="70" align="center">超級獎號</td></tr>']
+    for i, d in enumerate(rows):
+        out.append(f'<tr class="{"r0" if i % 2 else "r1"}"><td align="center"><font class="f_id">{d["id"]}</font>期</td>'
+                   f'<td class="bingo_nums">{"&nbsp;".join(f"{n:02d}" for n in d["nums"])}</td>'
+                   f'<td align="center">超:<font color="#cc0000"><b>{d["nums"][-1]:02d}</b></font></td></tr>')
+    out.append('</table>')
+    return _page_shell(cfg, "\r\n".join(out), page, pages)
+
+def render_lotto(game, rows, page, pages):
+    cfg = GAMES[game]
+    out = ['<table width="980" border="1" align="center" cellpadding="3" cellspacing="0" class="auto-style1">',
+           '<tr class="title"><td align="center">開獎日期</td><td align="center">開獎號碼</td>' + ('<td align="center">特別號</td>' if cfg["special"] else '') + '</tr>']
+    for i, d in enumerate(rows):
+        day = date(*map(int, d["id"].split("/")))
+        special = f'<td align="center"><font color="#cc0000">{int(d["special"]):02d}</font></td>' if cfg["special"] and d.get("special") not in (None, "", "無") else ""
+        out.append(f'<tr class="{"r0" if i % 2 else "r1"}"><td align="center">{d["id"]}<br/>({WEEKDAYS[day.weekday()]})</td>'
+                   f'<td align="center">{", ".join(f"{int(n):02d}" for n in d["nums"])}</td>{special}</tr>')
+    out.append('</table>')
+    return _page_shell(cfg, "\r\n".join(out), page, pages)
+
+
+# --- 故障注入 ---
+class Faults:
+    def __init__(self, latency=0, jitter=0, error_rate=0.0, drop_rate=0.0, rps=0.0, seed=None):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.rps = rps
+        self.rng = random.Random(seed)
+        self.tokens = rps
+        self.refilled = time.monotonic()
+        self.lock = threading.Lock()
+
+    # 令牌桶限流：每秒補 rps 個、最多存 rps 個；沒有令牌就回 429
+    def throttled(self):
+        if self.rps <= 0: return False
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rps, self.tokens + (now - self.refilled) * self.rps)
+            self.refilled = now
+            if self.tokens < 1: return True
+            self.tokens -= 1
+            return False
+
+    def roll(self):
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            return delay, self.rng.random() < self.drop_rate, self.rng.random() < self.error_rate
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose: super().log_message(fmt, *args)
+
+    def _send(self, status, body=b"", headers=None):
+        self.server.count(status)
+        self.send_response(status)
+        for k, v in (headers or {}).items(): self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD": self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == "/_replay/advance":
+            game = parse_qs(url.query).get("game", ["bingo"])[0]
+            if game not in self.server.timelines: return self._send(404)
+            n = int(parse_qs(url.query).get("n", ["1"])[0])
+            latest = self.server.timelines[game].advance(n)
+            return self._send(200, json.dumps(latest, ensure_ascii=False).encode("utf-8"), {"Content-Type": "application/json; charset=utf-8"})
+        self._send(404)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/_replay/stats":
+            return self._send(200, json.dumps(self.server.stats(), ensure_ascii=False).encode("utf-8"), {"Content-Type": "application/json; charset=utf-8"})
+
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or parts[1] != "list.asp" or parts[0] not in self.server.timelines: return self._send(404)
+        game = parts[0]
+
+        faults = self.server.faults
+        if faults.throttled(): return self._send(429, headers={"Retry-After": "1"})
+        delay, drop, error = faults.roll()
+        if delay: time.sleep(delay)
+        if drop:
+            self.server.count("dropped")
+            self.close_connection = True
+            return
+        if error: return self._send(503, "Service Unavailable".encode("ascii"), {"Content-Type": "text/plain"})
+
+        try: page = max(1, int(parse_qs(url.query).get("indexpage", ["1"])[0]))
+        except ValueError: page = 1
+        timeline = self.server.timelines[game]
+        draws = timeline.draws()
+        rows_per_page = GAMES[game]["rows"]
+        pages = max(1, -(-len(draws) // rows_per_page))
+        rows = draws[(page - 1) * rows_per_page: page * rows_per_page]
+
+        # 條件式請求：頁面內容只跟最新一期與頁碼有關
+        etag = f'"{game}-{page}-{draws[0]["id"].replace("/", "")}"'
+        validators = {"ETag": etag, "Last-Modified": self.date_time_string(timeline.opened_at)}
+        if self.headers.get("If-None-Match") == etag: return self._send(304, headers=validators)
+
+        html = render_bingo(rows, page, pages) if game == "bingo" else render_lotto(game, rows, page, pages)
+        body = html.encode("big5")
+        headers = {"Content-Type": "text/html; charset=big5", **validators}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, timelines, faults, verbose=False):
+        super().__init__(address, ReplayHandler)
+        self.timelines = timelines
+        self.faults = faults
+        self.verbose = verbose
+        self.counts = {}
+        self.counts_lock = threading.Lock()
+
+    def count(self, key):
+        with self.counts_lock: self.counts[str(key)] = self.counts.get(str(key), 0) + 1
+
+    def stats(self):
+        with self.counts_lock: counts = dict(self.counts)
+        return {"responses": counts, "latest": {g: t.draws()[0]["id"] for g, t in self.timelines.items()}}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+# 建立替身 (port=0 代表隨機埠)；start=True 時在背景執行緒服務，呼叫端用 server.shutdown() 結束
+def serve(host="127.0.0.1", port=0, interval=300, lotto_interval=3600, capture_dir=CAPTURE_DIR, seed_db=False,
+          latency=0, jitter=0, error_rate=0.0, drop_rate=0.0, rps=0.0, seed=None, verbose=False, start=True):
+    timelines = {game: Timeline(game, seed_history(game, capture_dir, seed_db), interval if game == "bingo" else lotto_interval) for game in GAMES}
+    server = ReplayServer((host, port), timelines, Faults(latency, jitter, error_rate, drop_rate, rps, seed), verbose)
+    if start: threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="pilio 本地替身 (重播 list.asp + 故障注入)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=300, help="賓果每幾秒開出新的一期 (0 = 不自動開獎)")
+    parser.add_argument("--lotto-interval", type=float, default=3600, help="樂透每幾秒開出新的一期")
+    parser.add_argument("--capture-dir", default=CAPTURE_DIR, help="擷取頁面目錄 ({game}_list_p*.html)")
+    parser.add_argument("--seed-db", action="store_true", help="沒有擷取頁面時用 draw_store 的歷史")
+    parser.add_argument("--latency", type=float, default=0, help="每個請求的延遲 (ms)")
+    parser.add_argument("--jitter", type=float, default=0, help="延遲的隨機抖動 ± (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="回 503 的比例")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="不回應直接斷線的比例")
+    parser.add_argument("--rps", type=float, default=0.0, help="每秒最多請求數，超過回 429 (0 = 不限)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.interval, args.lotto_interval, args.capture_dir, args.seed_db,
+                   args.latency, args.jitter, args.error_rate, args.drop_rate, args.rps, args.seed, args.verbose, start=False)
+    print(f"pilio 替身：{server.base_url} (PILIO_BASE_URL={server.base_url})")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally: server.server_close()
+
+if __name__ == "__main__":
+    main()
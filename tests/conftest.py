@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 模組都放在 repo 根目錄 (沒有套件安裝)，測試直接從這裡 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+import math
+import itertools
+import numpy as np
+import pytest
+import lotto_combos
+
+@pytest.fixture
+def tiny(monkeypatch):
+    monkeypatch.setitem(lotto_combos.GAMES, "tiny", {"max_n": 12, "pick": 4, "rules": {}})
+    return "tiny"
+
+def test_unrank_matches_itertools_order(tiny):
+    combos = list(itertools.combinations(range(1, 13), 4))
+    assert lotto_combos.unrank(np.arange(len(combos)), tiny).tolist() == [list(c) for c in combos]
+
+def test_unrank_full_lto539():
+    total = math.comb(39, 5)
+    assert (lotto_combos.unrank(np.arange(total), "lto539") == lotto_combos.enumerate_combos("lto539")).all()
+
+def test_unrank_ltobig_samples():
+    ranks = [0, 1, 43, 44, 12345, 7000000, math.comb(49, 6) - 1]
+    got = lotto_combos.unrank(ranks, "ltobig").tolist()
+    for r, combo in zip(ranks, got):
+        assert tuple(combo) == next(itertools.islice(itertools.combinations(range(1, 50), 6), r, None))
+
+def test_iter_combos_matches_enumeration(tiny):
+    chunks = [c for _, c in lotto_combos.iter_combos(tiny, chunk=37)]
+    assert (np.concatenate(chunks) == lotto_combos.enumerate_combos(tiny)).all()
+
+# 特徵暴力版：AC 值 = 相異差值個數 - (pick - 1)
+def test_combo_features_match_brute_force():
+    combos = lotto_combos.unrank(np.random.default_rng(0).choice(math.comb(49, 6), 2000, replace=False), "ltobig")
+    feats = lotto_combos.combo_features(combos)
+    primes = {2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47}
+    for i, c in enumerate(combos.tolist()):
+        diffs = {b - a for a, b in itertools.combinations(c, 2)}
+        assert feats["ac"][i] == len(diffs) - 5
+        assert feats["sum"][i] == sum(c)
+        assert feats["odd"][i] == sum(n % 2 for n in c)
+        assert feats["consecutive"][i] == sum(b - a == 1 for a, b in zip(c, c[1:]))
+        assert feats["prime"][i] == sum(n in primes for n in c)
+        assert feats["zone"][i] == len({n // 10 for n in c})
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from bingo_features import CoOccurrence, GapIndex
+
+def make_draws(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"id": str(115000000 + n - i), "nums": sorted(int(x) for x in rng.choice(80, 20, replace=False) + 1)} for i in range(n)]
+
+def same(a, b):
+    if isinstance(a, CoOccurrence): return (a.matrix == b.matrix).all() and (a.counts == b.counts).all()
+    return (a.current() == b.current()).all() and (a.hist == b.hist).all() and (a.gap_max == b.gap_max).all()
+
+INDEXES = [lambda: CoOccurrence(window=80), lambda: GapIndex()]
+
+# 逐期進來 (含跨過 BULK 的整批) 跟一次建好的結果相同
+@pytest.mark.parametrize("make", INDEXES)
+def test_incremental_matches_fresh_build(make):
+    data = make_draws(300)
+    index = make()
+    for k in (290, 289, 280, 200, 130, 0):
+        index.sync(data[k:k + 80] if isinstance(index, CoOccurrence) else data[k:])
+    assert same(index, make().sync(data[:80] if isinstance(index, CoOccurrence) else data))
+
+# 回補後同一個最新期別但歷史變深：要把較舊的期別也算進去
+@pytest.mark.parametrize("make", INDEXES)
+def test_deeper_history_rebuilds(make):
+    data = make_draws(80)
+    index = make().sync(data[:10])
+    assert same(index.sync(data), make().sync(data))
+
+# 中間補洞、資料變短 (視窗內的舊期別不一樣) 都要重建
+@pytest.mark.parametrize("make", INDEXES)
+def test_filled_gap_rebuilds(make):
+    data = make_draws(80)
+    index = make().sync(data[:30] + data[40:])
+    assert same(index.sync(data), make().sync(data))
+
+def test_shorter_history_rebuilds_window():
+    data = make_draws(80)
+    index = CoOccurrence(window=80).sync(data)
+    assert same(index.sync(data[:50]), CoOccurrence(window=80).sync(data[:50]))
@@ -0,0 +1,21 @@
+import numpy as np
+from bingo_core import models
+
+def make_draws(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"id": str(115000000 + n - i), "nums": sorted(int(x) for x in rng.choice(80, 20, replace=False) + 1)} for i in range(n)]
+
+# raw 跟舊版 dict(Counter) 一樣是開出次數 (只列出有開出的號碼)，rates 是前三名的開出率 %
+def test_run_simulation_raw_counts():
+    top_3, rates, raw, attrs = models.run_simulation(make_draws(30), trials=5000)
+    assert all(isinstance(c, int) and c > 0 for c in raw.values())
+    assert sum(raw.values()) == 5000 * 20
+    assert sorted(raw, key=lambda n: -raw[n])[:3] == top_3
+    assert rates == {n: raw[n] / 5000 * 100 for n in top_3}
+    assert len(attrs) == 80
+
+def test_run_simulation_exact_expected_counts():
+    top_3, rates, raw, _ = models.run_simulation(make_draws(30), trials=5000, method="exact")
+    assert len(raw) == 80
+    assert abs(sum(raw.values()) - 5000 * 20) < 1e-6
+    assert sorted(raw, key=lambda n: -raw[n])[:3] == top_3
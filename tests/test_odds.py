@@ -0,0 +1,97 @@
+import math
+import random
+import itertools
+import pytest
+import bingo_odds
+from bingo_odds import BALLS, DRAWN, UNIT, HIT_PROB, period_outcomes, evaluate_strategy, star_grid
+from bingo_prize import PRIZE, COST
+
+def hypergeom(k, h):
+    return math.comb(k, h) * math.comb(BALLS - k, DRAWN - h) / math.comb(BALLS, DRAWN)
+
+# 暴力版單期分佈：策略用到的 B 個號碼中恰好開出 h 個時，每種組合等機率 (hypergeom(B, h) / C(B, h))
+def brute_period(tickets):
+    base = sorted({n for nums, _ in tickets for n in nums})
+    dist = {}
+    for h in range(len(base) + 1):
+        p = hypergeom(len(base), h) / math.comb(len(base), h)
+        for drawn in itertools.combinations(base, h):
+            prize = sum(PRIZE[len(nums), len(set(nums) & set(drawn))] * mult for nums, mult in tickets) // UNIT
+            dist[prize] = dist.get(prize, 0) + p
+    return dist, sum(COST * mult for _, mult in tickets) // UNIT
+
+# 暴力版多期：列舉每一期的所有結果序列
+def brute_strategy(tickets, periods, bankroll):
+    dist, cost = brute_period(tickets)
+    outcomes = list(dist.items())
+    p_profit = p_ruin = 0.0
+    for seq in itertools.product(outcomes, repeat=periods):
+        p = math.prod(q for _, q in seq)
+        if sum(u for u, _ in seq) > cost * periods: p_profit += p
+        money = bankroll // UNIT
+        for u, _ in seq:
+            if money < cost:
+                p_ruin += p
+                break
+            money += u - cost
+    return p_profit, p_ruin
+
+STRATEGIES = [
+    [((1, 2, 3), 4)],
+    [((1, 2, 3), 1), ((1, 2), 1), ((1, 3), 1), ((2, 3), 1)],
+    [((1,), 1), ((1, 2, 3, 4, 5), 2)],
+    [((5, 9), 1), ((11, 12, 13, 14), 1)],
+]
+
+def test_hit_prob_rows_sum_to_one():
+    for k in range(1, 11):
+        assert HIT_PROB[k, :k + 1].sum() == pytest.approx(1, abs=1e-12)
+        assert HIT_PROB[k, :k + 1] == pytest.approx([hypergeom(k, h) for h in range(k + 1)], rel=1e-12)
+
+@pytest.mark.parametrize("tickets", STRATEGIES)
+def test_period_outcomes_match_enumeration(tickets):
+    units, probs, cost = period_outcomes(tickets)
+    dist, brute_cost = brute_period(tickets)
+    assert cost == brute_cost
+    assert dict(zip(units.tolist(), probs)) == pytest.approx(dist, abs=1e-15)
+
+@pytest.mark.parametrize("tickets", STRATEGIES)
+@pytest.mark.parametrize("periods, bankroll", [(1, 100), (3, 100), (4, 250), (4, 5000)])
+def test_multi_period_dp_matches_enumeration(tickets, periods, bankroll):
+    dist, cost = brute_period(tickets)
+    mean = sum(u * p for u, p in dist.items())
+    result = evaluate_strategy(tickets, periods, bankroll)
+    p_profit, p_ruin = brute_strategy(tickets, periods, bankroll)
+    assert result["ev"] == pytest.approx((mean - cost) * UNIT * periods)
+    assert result["p_profit"] == pytest.approx(p_profit, abs=1e-12)
+    assert result["p_ruin"] == pytest.approx(p_ruin, abs=1e-12)
+
+def test_star_grid_matches_single_strategy():
+    grid = star_grid(max_mult=5, max_periods=4, bankroll=200)
+    for k in (1, 3, 7):
+        for mult in (1, 2, 5):
+            for periods in (1, 4):
+                single = evaluate_strategy([(tuple(range(k)), mult)], periods, 200)
+                cell = (k - 1, mult - 1, periods - 1)
+                assert grid["ev"][cell] == pytest.approx(single["ev"])
+                assert grid["std"][cell] == pytest.approx(single["std"])
+                assert grid["p_profit"][cell] == pytest.approx(single["p_profit"], abs=1e-12)
+                assert grid["p_ruin"][cell] == pytest.approx(single["p_ruin"], abs=1e-12)
+
+def test_too_many_numbers_rejected():
+    with pytest.raises(ValueError):
+        period_outcomes([(tuple(range(1, bingo_odds.MAX_BASE + 2)), 1)])
+
+# star_ladder 第 k 列 = 前 k 個號碼單獨玩 k 星逐期對獎
+def test_star_ladder_matches_loop():
+    from bingo_features import to_masks
+    from bingo_prize import star_ladder
+    rng = random.Random(7)
+    draws = [sorted(rng.sample(range(1, 81), 20)) for _ in range(300)]
+    ranked = rng.sample(range(1, 81), 6)
+    result = star_ladder(ranked, to_masks(draws), mult=2)
+    assert result['ticket_net'].shape == (6,)
+    for k in range(1, 7):
+        win = sum(PRIZE[k, len(set(ranked[:k]) & set(d))] * 2 for d in draws)
+        assert result['prize'][k - 1].sum() == win
+        assert result['ticket_net'][k - 1] == win - COST * 2 * len(draws)
@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+import pytest
+import pilio_replay
+from pilio_replay import DRAW_STEPS, _next_id, _prev_id
+
+START = {"ltobig": "2026/02/06", "lto": "2026/02/05", "lto539": "2026/02/07"}
+
+# 官方開獎日：大樂透週二 / 五、威力彩週一 / 四、今彩539 週一到週六
+@pytest.mark.parametrize("game, weekdays", [("ltobig", {1, 4}), ("lto", {0, 3}), ("lto539", {0, 1, 2, 3, 4, 5})])
+def test_lotto_dates_fall_on_draw_days(game, weekdays):
+    d = START[game]
+    for _ in range(60):
+        d = _prev_id(game, d)
+        assert date(*map(int, d.split("/"))).weekday() in weekdays
+
+def test_known_ltobig_and_lto_dates():
+    assert _prev_id("ltobig", "2026/02/06") == "2026/02/03"
+    assert _prev_id("ltobig", "2026/02/03") == "2026/01/30"
+    assert _prev_id("lto", "2026/02/05") == "2026/02/02"
+    assert _prev_id("lto", "2026/02/02") == "2026/01/29"
+
+@pytest.mark.parametrize("game", ["bingo", *DRAW_STEPS])
+def test_next_and_prev_round_trip(game):
+    d = str(pilio_replay.BINGO_LATEST) if game == "bingo" else START[game]
+    for _ in range(60):
+        assert _next_id(game, _prev_id(game, d)) == d
+        assert _prev_id(game, _next_id(game, d)) == d
+        d = _prev_id(game, d)
+
+# 一週內的步數加起來剛好 7 天
+def test_draw_steps_cover_a_week():
+    for steps in DRAW_STEPS.values():
+        assert sum(steps.values()) == 7
+        day = min(steps)
+        for _ in steps: day = (day + steps[day]) % 7
+        assert day == min(steps)
+
+def test_seed_history_starts_on_a_draw_day():
+    history = pilio_replay.seed_history("ltobig")
+    latest = date(*map(int, history[0]["id"].split("/")))
+    assert latest.weekday() in DRAW_STEPS["ltobig"]
+    assert date.today() - latest < timedelta(days=7)
+
+# perf_trace 記的是線上傳輸大小 (gzip 後)，解壓後大小另外放在 decoded
+def test_perf_trace_records_wire_bytes():
+    import pilio_client, perf_trace
+    server = pilio_replay.serve(interval=0)
+    try:
+        res = pilio_client.get(f"{server.base_url}/bingo/list.asp", conditional=False)
+        perf_trace.response("test_wire", res)
+        info = perf_trace.summary("test_wire")["test_wire"]["upstream"]["last"]
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert info["bytes"] == int(res.headers["Content-Length"]) < info["decoded"] == len(res.content)
+    finally:
+        server.shutdown()
+        server.server_close()
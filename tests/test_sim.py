@@ -0,0 +1,66 @@
+import itertools
+import numpy as np
+import pytest
+from bingo_sim import sample_counts, inclusion_probs
+
+# 暴力版：逐顆不放回加權抽樣的所有排列，累加每個號碼被抽中的機率
+def brute_inclusion(weights, pick):
+    w = np.asarray(weights, dtype=np.float64)
+    probs = np.zeros(len(w))
+    for order in itertools.permutations(range(len(w)), pick):
+        p, left = 1.0, w.sum()
+        for i in order:
+            p *= w[i] / left
+            left -= w[i]
+        probs[list(order)] += p
+    return probs
+
+@pytest.mark.parametrize("weights, pick", [
+    ([1, 2, 3, 4, 5, 6], 3),
+    ([0.5, 10, 1, 1, 7, 3, 2], 4),
+    ([1, 1, 1, 1, 1], 2),
+    ([0, 3, 1, 0, 5, 2], 2),
+    ([9, 1, 1, 1, 1, 1, 1, 1], 5),
+])
+def test_inclusion_probs_match_enumeration(weights, pick):
+    assert inclusion_probs(weights, pick=pick) == pytest.approx(brute_inclusion(weights, pick), abs=1e-9)
+
+def test_inclusion_probs_too_few_positive_weights():
+    assert inclusion_probs([0, 2, 0, 1], pick=3).tolist() == pytest.approx([0.5, 1, 0.5, 1])
+
+def test_inclusion_probs_sum_to_pick():
+    w = np.random.default_rng(0).uniform(1, 60, 80)
+    probs = inclusion_probs(w)
+    assert probs.sum() == pytest.approx(20, abs=1e-9)
+    assert ((probs > 0) & (probs < 1)).all()
+
+# 權重差距極大：重的號碼幾乎必定開出，其餘 17 個名額由 77 個輕的號碼平分
+@pytest.mark.parametrize("weights", [[1e6] * 3 + [1] * 77, np.random.default_rng(1).lognormal(0, 3, 80)])
+def test_inclusion_probs_skewed_weights(weights):
+    probs = inclusion_probs(weights)
+    assert probs.sum() == pytest.approx(20, abs=1e-9)
+    counts = sample_counts(weights, 200000, rng=np.random.default_rng(4))
+    assert probs == pytest.approx(counts / 200000, abs=0.006)
+
+def test_inclusion_probs_heavy_numbers():
+    probs = inclusion_probs([1e6] * 3 + [1] * 77)
+    assert probs[:3] == pytest.approx(1, abs=1e-4)
+    assert probs[3:] == pytest.approx(17 / 77, abs=1e-4)
+
+# 每一次模擬剛好 pick 顆 (float32 鍵值同值時也一樣)
+@pytest.mark.parametrize("weights", [np.ones(80), np.r_[np.ones(40), np.full(40, 1e-3)]])
+def test_sample_counts_exact_pick_per_trial(weights):
+    counts = sample_counts(weights, 50000, rng=np.random.default_rng(1), chunk_rows=4096)
+    assert counts.sum() == 50000 * 20
+
+# 正權重不足 pick 個：權重 0 的鍵值全是 -inf (同值)，正權重的號碼每次都開出，其餘名額從權重 0 的號碼補
+def test_sample_counts_ties_at_threshold():
+    weights = np.r_[np.ones(10), np.zeros(70)]
+    counts = sample_counts(weights, 2000, rng=np.random.default_rng(3))
+    assert counts.sum() == 2000 * 20
+    assert (counts[:10] == 2000).all()
+
+def test_sample_counts_close_to_exact():
+    weights = [1, 2, 3, 4, 5, 6]
+    counts = sample_counts(weights, 200000, pick=3, rng=np.random.default_rng(2))
+    assert counts / 200000 == pytest.approx(brute_inclusion(weights, 3), abs=0.005)